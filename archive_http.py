@@ -0,0 +1,212 @@
+'''
+Browserless backend for bbarchivescraper. Finished matches never change, so instead of driving
+Chrome through the results list and the statistics tab, the same data is read from the feeds the
+Flashscore pages themselves load, over one pooled keep-alive HTTP session.
+
+Feed payloads are records separated by '~', fields separated by '¬' and keys separated from
+values by '÷', e.g. "AA÷Ct7CvEYk¬AE÷Boston Celtics¬AG÷112¬~".
+
+Experimental: the feed names, record keys and x-fsign header below haven't been checked against
+captures of the live site, the tests only replay hand-built pages and feeds in this format. Compare a
+season with the browser backend before relying on it.
+'''
+import re
+from datetime import datetime
+from typing import Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from page_cache import match_id_from_link
+from rate_governor import governor
+from retry_policy import RetryPolicy, retry_call
+
+FEED_URL = "https://global.flashscore.ninja/2/x/feed/{feed}"
+FEED_SIGN = "SW9D1eZo"
+# Seconds one request may take, and the retries around it
+REQUEST_TIMEOUT = 30
+HTTP_RETRY = RetryPolicy(attempts=4, base_delay=0.5, deadline=120.0)
+
+# Results list records
+MATCH_ID = "AA"
+START_TIME = "AD"
+HOME_NAME = "AE"
+AWAY_NAME = "AF"
+HOME_SCORE = "AG"
+AWAY_SCORE = "AH"
+# Period scores of finished matches: quarters 1-4, then overtime
+HOME_PARTS = ("BA", "BC", "BE", "BG", "BI")
+AWAY_PARTS = ("BB", "BD", "BF", "BH", "BJ")
+# Header record of the results feed
+COUNTRY_ID = "ZB"
+TOURNAMENT_ID = "ZEE"
+SEASON_ID = "ZC"
+# Statistics records
+STATS_PERIOD = "SE"
+STATS_CATEGORY = "SG"
+STATS_HOME = "SH"
+STATS_AWAY = "SI"
+
+RESULTS_PAGE_FEED = "tr_3_{country_id}_{tournament_id}_{season_id}_{page}_0_en_1"
+STATS_FEED = "df_st_1_{match_id}"
+
+INITIAL_RESULTS_PATTERN = re.compile(r"cjs\.initialFeeds\['results'\]\s*=\s*\{\s*data:\s*`(.*?)`", re.DOTALL)
+
+
+def parse_feed(payload: str) -> List[Dict[str, str]]:
+    records = []
+    for raw_record in payload.split('~'):
+        record = {}
+        for field in raw_record.split('¬'):
+            key, sep, value = field.partition('÷')
+            if sep:
+                record[key] = value
+        if record:
+            records.append(record)
+    return records
+
+
+class FlashscoreHttpArchive:
+    def __init__(self, headers: Dict[str, str], base_url: str = "https://www.flashscore.com", pool_size: int = 8,
+                 feed_url: str = FEED_URL):
+        self.base_url = base_url
+        self.feed_url = feed_url
+
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, name: str, url: str, headers: Dict[str, str] = None) -> requests.Response:
+        # Paced by the rate governor and retried under HTTP_RETRY, 5xx answers included
+        def fetch():
+            with governor.request(url):
+                response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+                response.raise_for_status()
+            return response
+        response = retry_call(name, url, fetch, HTTP_RETRY)
+        response.encoding = 'utf-8'
+        return response
+
+    def fetch_feed(self, feed: str) -> List[Dict[str, str]]:
+        response = self.get("feed", self.feed_url.format(feed=feed), {"x-fsign": FEED_SIGN, "Referer": self.base_url + "/"})
+        return parse_feed(response.text)
+
+    def match_link(self, match_id: str) -> str:
+        return f"{self.base_url}/match/{match_id}/#/match-summary"
+
+    def match_row(self, record: Dict[str, str]) -> Dict[str, str]:
+        # Same keys and text the browser reads off an event__match row
+        return {
+            "link": self.match_link(record[MATCH_ID]),
+            "DATE": datetime.fromtimestamp(int(record[START_TIME])).strftime("%d.%m."),
+            "HOME": record.get(HOME_NAME, ""),
+            "AWAY": record.get(AWAY_NAME, ""),
+            "H_SCORE": record.get(HOME_SCORE, ""),
+            "A_SCORE": record.get(AWAY_SCORE, ""),
+        }
+
+    def get_season_records(self, link: str) -> List[Dict[str, str]]:
+        link = link + "results/"
+        print(link)
+        response = self.get("results page", link)
+
+        found = INITIAL_RESULTS_PATTERN.search(response.text)
+        if not found:
+            print("Error: results feed not found on the season page.")
+            return []
+        records = parse_feed(found.group(1))
+
+        header = next((record for record in records if TOURNAMENT_ID in record), {})
+        match_records = [record for record in records if MATCH_ID in record]
+        seen = {record[MATCH_ID] for record in match_records}
+
+        # Same as clicking "show more" until it disappears
+        page = 1
+        while header:
+            feed = RESULTS_PAGE_FEED.format(country_id=header.get(COUNTRY_ID, ""), tournament_id=header[TOURNAMENT_ID],
+                                            season_id=header.get(SEASON_ID, ""), page=page)
+            try:
+                page_records = [record for record in self.fetch_feed(feed) if MATCH_ID in record and record[MATCH_ID] not in seen]
+            except requests.RequestException as e:
+                print(f"Error fetching results page {page}: {e}")
+                break
+            if not page_records:
+                print("Got to the end")
+                break
+            match_records.extend(page_records)
+            seen.update(record[MATCH_ID] for record in page_records)
+            page += 1
+
+        return match_records
+
+    def get_season_matches(self, link: str, saved_count: int):
+        match_records = self.get_season_records(link)
+        print(f'length = {len(match_records)}\n')
+        if saved_count > len(match_records):
+            print("Error: Matches found is less than stored count. Exiting.")
+            return [], 0
+
+        matches = match_records[:len(match_records) - saved_count]
+        print(f'matches length = {len(matches)}\n')
+
+        seasons_match_details = []
+        for record in matches:
+            if not record.get(HOME_SCORE) or not record.get(AWAY_SCORE) or START_TIME not in record:
+                continue
+            seasons_match_details.append(self.match_row(record))
+
+        return seasons_match_details, len(matches)
+
+    def get_season_quarter_scores(self, link: str) -> Dict[str, List[str]]:
+        '''
+        Quarter scores of every finished match of a season, laid out like the 12 smh__part cells
+        of a match page: home total, Q1-Q4, OT, then the same for the away team.
+        '''
+        quarter_scores = {}
+        for record in self.get_season_records(link):
+            if not record.get(HOME_SCORE) or not record.get(AWAY_SCORE) or not record.get(HOME_PARTS[0]):
+                continue
+            home = [record[HOME_SCORE]] + [record.get(key, "") for key in HOME_PARTS]
+            away = [record[AWAY_SCORE]] + [record.get(key, "") for key in AWAY_PARTS]
+            home[5] = home[5] or '0'
+            away[5] = away[5] or '0'
+            # Keyed on the id alone, a record without a start time still has its quarter scores
+            quarter_scores[self.match_link(record[MATCH_ID])] = home + away
+        return quarter_scores
+
+    def get_match_statistics(self, link: str, alt_name: Dict[str, str]):
+        match_id = match_id_from_link(link)
+        if not match_id:
+            print(f"Error: no match id in {link}")
+            return {}
+
+        result_dict = {}
+        try:
+            period = None
+            for record in self.fetch_feed(STATS_FEED.format(match_id=match_id)):
+                if STATS_PERIOD in record:
+                    period = record[STATS_PERIOD]
+                # The statistics tab opens on the whole-match figures, the quarter breakdowns are skipped
+                if period != "Match" or STATS_CATEGORY not in record:
+                    continue
+
+                category = record[STATS_CATEGORY]
+                home_value = record.get(STATS_HOME, "")
+                away_value = record.get(STATS_AWAY, "")
+                if category.endswith('%'):
+                    home_value = home_value.replace('%', '')
+                    away_value = away_value.replace('%', '')
+                if category == 'Technical fouls': continue
+                result_dict.update({"H_" + alt_name[category]: home_value})
+                result_dict.update({"A_" + alt_name[category]: away_value})
+
+        except Exception as e:
+            print(f"Error: {e}")
+            return {}
+
+        return result_dict
+
+    def close(self):
+        self.session.close()
@@ -1,7 +1,6 @@
 import time
 import os
-import csv
-import pandas as pd
+import asyncio
 from datetime import datetime
 from typing import Dict, List
 from selenium import webdriver
@@ -9,430 +8,152 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from contextlib import suppress
-from threading import Thread
-from datetime import datetime
-
-
-class FlashscoreBasketballScraper:
-    def __init__(self, headless: bool = True, delay: float = 2.0):
-        self.base_url = "https://www.flashscore.com"
-        self.delay = delay
-        self.driver = None
-        self.stats_driver = None
-        self.headless = headless
-        
-        # Headers to mimic real browser
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
+from threading import Lock
+from queue import Queue, Empty
+from browser_profile import apply_lean_profile, start_lean_session, page_weight, dismiss_consent
+from archive_http import FlashscoreHttpArchive
+from page_cache import page_cache, match_id_from_link
+from season_archive import SeasonArchive
+from season_metrics import recompute_seasons
+from rate_governor import governor
+from page_waits import load_page
+from retry_policy import classify_failure
+
+
+# Statistics tab category -> CSV column suffix, shared with the HTTP backend
+STAT_NAMES = {
+    "Field goals attempts": "FGA",
+    "Field goals made": "FG",
+    "Field goals %": "FG%",
+    "2-point field goals attempts": "2FGA",
+    "2-point field goals made": "2FG",
+    "2-point field goals %": "2FG%",
+    "3-point field goals attempts": "3FGA",
+    "3-point field goals made": "3FG",
+    "3-point field goals %": "3FG%",
+    "Free throws attempts": "FTA",
+    "Free throws made": "FT",
+    "Free throws %": "FT%",
+    "Offensive rebounds": "OREB",
+    "Defensive rebounds": "DREB",
+    "Total rebounds": "TREB",
+    "Assists": "AST",
+    "Blocks": "BLKS",
+    "Turnovers": "TOV",
+    "Steals": "STL",
+    "Personal fouls": "P_FOULS"
+}
+
+
+class StatsDriverPool:
+    """
+    Bounded pool of warm Chrome instances for the match statistics pages.
+    A driver is checked out per match and handed back afterwards. It is quit and
+    replaced after max_uses checkouts, or straight away if the checkout failed.
+    """
+    def __init__(self, factory, size: int = 1, max_uses: int = 100):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.idle = Queue()
+        self.uses = {}
+        self.live = 0
+        self.lock = Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "recycled": 0,
+            "crashed": 0,
+            "startups": 0,
+            "startup_time": 0.0,
         }
-        
-    def setup_driver(self) -> webdriver.Chrome:
-        chrome_options = Options()
-        if self.headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument(f"user-agent={self.headers['User-Agent']}")
-        
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        return driver
-    
-
-
-    def get_seasons_list(self, country: str, league: str):
-        country = country.lower()
-        league = league.lower()
-        archive_url = f"{self.base_url}/basketball/{country}/{league}/archive/"
-        
-        if not self.driver:
-            self.driver = self.setup_driver()
-            
-        try:
-            self.driver.get(archive_url) 
-            with suppress(Exception):
-                accept_button = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-                )
-                accept_button.click()
-
-            time.sleep(3)
-            
-            season_elements = self.driver.find_elements(By.CSS_SELECTOR, "div.archiveLatte__season > a.archiveLatte__text")
-            seasons = []
-            season_links = []
 
-            if (len(season_elements) > 0):
-                for element in season_elements:
-                    seasons.append(element.text)
-                    season_links.append(element.get_attribute("href"))
-                return seasons, season_links
-                
-            else:
-                print("Error: Season list is empty!")
-                    
-        except Exception as e:
-            print(f"Error getting seasons list: {e}")
-            return ([], [])
-        
-
-    def get_season_matches(self, link: str, saved_count: int):
-        link = link + "results/"
-        print(link)
-        self.driver.get(link)
-        time.sleep(3)
+    def acquire(self):
         while True:
-            try:
-                show_more_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CLASS_NAME, "wclButtonLink"))
-                )
-                self.driver.execute_script("arguments[0].scrollIntoView();", show_more_button)
-                time.sleep(0.5) 
-                self.driver.execute_script("arguments[0].click();", show_more_button)
-                time.sleep(1)
-            except Exception as e:
-                print("Got to the end")
-                break
-
-        all_season_matches = self.driver.find_elements(By.CLASS_NAME, "event__match")
-        seasons_match_details = []
-        
-        #Not sure why, but saved_count+3 seems to be the index of the next row not saved yet
-        if saved_count > 0: saved_count += 3
-        for element in all_season_matches[saved_count:]:
-            link = element.find_element(By.TAG_NAME, "a").get_attribute("href")
-            date = element.find_element(By.CLASS_NAME, "event__time").text.split()[0]
-            home = element.find_element(By.CLASS_NAME, "event__participant--home").text
-            away = element.find_element(By.CLASS_NAME, "event__participant--away").text
-            home_fulltime_score = element.find_element(By.CLASS_NAME, "event__score--home").text
-            away_fulltime_score = element.find_element(By.CLASS_NAME, "event__score--away").text
-
-            # home_quater_scores = [scores.text for scores in element.find_elements(By.CLASS_NAME, "event__part--home")]
-            # away_quater_scores = [scores.text for scores in element.find_elements(By.CLASS_NAME, "event__part--away")]
-
-            if home_fulltime_score == "" or away_fulltime_score == "" : continue
-
-            # home_q1_score = home_quater_scores[0]
-            # home_q2_score = home_quater_scores[1]
-            # home_q3_score = home_quater_scores[2]
-            # home_q4_score = home_quater_scores[3]
-            # home_ot_score = home_quater_scores[4] if len(home_quater_scores) > 4 else 0
-            # away_q1_score = away_quater_scores[0]
-            # away_q2_score = away_quater_scores[1]
-            # away_q3_score = away_quater_scores[2]
-            # away_q4_score = away_quater_scores[3]
-            # away_ot_score = away_quater_scores[4] if len(away_quater_scores) > 4 else 0
-            details = {
-                "link": link,
-                "DATE": date,
-                "HOME": home,
-                "AWAY": away,
-                "H_SCORE": home_fulltime_score,
-                # "home_q1_score": home_q1_score,
-                # "home_q2_score": home_q2_score,
-                # "home_q3_score": home_q3_score,
-                # "home_q4_score": home_q4_score,
-                # "home_ot_score": home_ot_score,
-                "A_SCORE": away_fulltime_score,
-                # "away_q1_score": away_q1_score,
-                # "away_q2_score": away_q2_score,
-                # "away_q3_score": away_q3_score,
-                # "away_q4_score": away_q4_score,
-                # "away_ot_score": away_ot_score,
-            }
-            seasons_match_details.append(details)
-        
-        return seasons_match_details, len(all_season_matches)
-
-
-    def get_match_statistics(self, link: str):
-        alt_name = {
-            "Field goals attempts": "FGA",
-            "Field goals made": "FG",
-            "Field goals %": "FG%",
-            "2-point field goals attempts": "2FGA",
-            "2-point field goals made": "2FG",
-            "2-point field goals %": "2FG%",
-            "3-point field goals attempts": "3FGA",
-            "3-point field goals made": "3FG",
-            "3-point field goals %": "3FG%",
-            "Free throws attempts": "FTA",
-            "Free throws made": "FT",
-            "Free throws %": "FT%",
-            "Offensive rebounds": "OREB",
-            "Defensive rebounds": "DREB",
-            "Total rebounds": "TREB",
-            "Assists": "AST",
-            "Blocks": "BLKS",
-            "Turnovers": "TOV",
-            "Steals": "STL",
-            "Personal fouls": "P_FOULS"
-        }
+            with self.lock:
+                with suppress(Empty):
+                    driver = self.idle.get_nowait()
+                    self.stats["hits"] += 1
+                    return driver
+                if self.live < self.size:
+                    self.stats["misses"] += 1
+                    self.live += 1
+                    break
 
-        self.stats_driver = self.setup_driver()
-        result_dict = {}
+            # Every driver is checked out, wait for one to be handed back or retired
+            with suppress(Empty):
+                driver = self.idle.get(timeout=1)
+                with self.lock:
+                    self.stats["hits"] += 1
+                return driver
 
+        start = time.perf_counter()
         try:
-            self.stats_driver.get(link)
-            with suppress(Exception):
-                WebDriverWait(self.stats_driver, 5).until(
-                    EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-                ).click()
-            time.sleep(3)
-            buttons = self.stats_driver.find_elements(By.CSS_SELECTOR, "div.filterOver.filterOver--indent > div > a")
-
-            stats_link = buttons[2].get_attribute("href")
-            # print(f"stats link = {stats_link}")
-            self.stats_driver.get(stats_link)
-            time.sleep(3)
-
-            statistic_rows = self.stats_driver.find_elements(By.CSS_SELECTOR, "div.section > div.wcl-row_2oCpS")
-
-            for row in statistic_rows:
-                category_list = row.find_elements(By.CSS_SELECTOR, "div.wcl-category_Ydwqh > div")
-
-                home_value_element = category_list[0]
-                category_element = category_list[1]
-                away_value_element = category_list[2]
-
-                home_value = home_value_element.text
-                away_value = away_value_element.text
-                category = category_element.text
-
-                if category.endswith('%'):
-                    home_value = home_value.replace('%', '')
-                    away_value = away_value.replace('%', '')
-                if category == 'Technical fouls': continue
-                home_stats_name = "H_" + alt_name[category]
-                away_stats_name = "A_" + alt_name[category]
-                result_dict.update({home_stats_name : home_value})
-                result_dict.update({away_stats_name : away_value})
+            driver = self.factory()
+        except Exception:
+            with self.lock:
+                self.live -= 1
+            raise
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            self.uses[driver] = 0
+            self.stats["startups"] += 1
+            self.stats["startup_time"] += elapsed
+        return driver
 
-        except Exception as e:
-            print(f"Error: {e}")
+    def release(self, driver, failed: bool = False):
+        if driver is None:
+            return
+        with self.lock:
+            self.uses[driver] = self.uses.get(driver, 0) + 1
+            worn_out = self.uses[driver] >= self.max_uses
+            if failed:
+                self.stats["crashed"] += 1
+            elif worn_out:
+                self.stats["recycled"] += 1
+
+        if failed or worn_out:
+            self._quit(driver)
         else:
-            self.stats_driver.close()
-            return result_dict
-
-        return {}
-
-
-        
-    def close(self) -> None:
-        if self.driver:
-            self.driver.quit()
-
-
-def date_compare_less(date1, date2, year):
-    date1_arr = date1.split('.')
-    date2_arr = date2.split('.')
-    d1_d, d1_m = int(date1_arr[0]), int(date1_arr[1])
-    d2_d, d2_m = int(date2_arr[0]), int(date2_arr[1])
-    year = int(year)
-    d1_y = year if d1_m > 8 else year+1
-    d2_y = year if d2_m > 8 else year+1
-    print(datetime(d1_y, d1_m, d1_d), " ", datetime(d2_y, d2_m, d2_d))
-    return datetime(d1_y, d1_m, d1_d) < datetime(d2_y, d2_m, d2_d)
-
-
-
-def season_scraper(link: str, season_text: str, folder: str, field_names: List[str]):
-    try:
-        scraper = FlashscoreBasketballScraper(headless=True)
-        scraper.driver = scraper.setup_driver()
-        yr1, yr2 = season_text.split('/')[0], season_text.split('/')[1]
-        
-        csv_file = os.path.join(folder, f"{yr1}-{yr2}.csv")
-        file_exists = os.path.exists(csv_file)
-        saved_count = 0
-
-        if file_exists:
-            with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for _ in reader:
-                    saved_count += 1
-        print("saved count = ", saved_count)
-        #exit(1)
-
-        with open(csv_file, 'a', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, field_names)
-
-            if not file_exists:
-                writer.writeheader()
-                file.flush()
-                os.fsync(file.fileno())
-
-            season_matches, total_count = scraper.get_season_matches(link, saved_count)
-            print(f'total = {total_count}')
-            
-            counter = saved_count
-            for match in season_matches:
-                print(f'{counter + 1}/{total_count} \r', end='')
-                
-                match_stats = scraper.get_match_statistics(match["link"])                
-                
-                if not match_stats:
-                    match_stats = scraper.get_match_statistics(match["link"])
-                    if not match_stats:
-                        print("ERROR: Network is disconnected?!!")
-                        return
-                        
-                del match["link"]
-                csv_row = {}
-
-
-                home_possession = float(match_stats["H_FGA"]) + 0.44 * float(match_stats["H_FTA"]) - float(match_stats["H_OREB"]) + float(match_stats["H_TOV"])
-                away_possession = float(match_stats["A_FGA"]) + 0.44 * float(match_stats["A_FTA"]) - float(match_stats["A_OREB"]) + float(match_stats["A_TOV"])
-                
-                h_off_rating = str(round((float(match["H_SCORE"]) / home_possession) * 100, 2))
-                a_off_rating = str(round((float(match["A_SCORE"]) / away_possession) * 100, 2))
-                h_def_rating = str(round((float(match["A_SCORE"]) / home_possession) * 100, 2))
-                a_def_rating = str(round((float(match["H_SCORE"]) / away_possession) * 100, 2))
-                total_score = str(float(match["H_SCORE"]) + float(match["A_SCORE"]))
-
-                csv_row.update(match)
-                csv_row.update(match_stats)
-                csv_row.update({
-                    "H_OFF_RATING": h_off_rating,
-                    "A_OFF_RATING": a_off_rating,
-                    "H_DEF_RATING": h_def_rating,
-                    "A_DEF_RATING": a_def_rating,
-                    "TOTAL": total_score
-                })
-                
-                print(csv_row)
-                writer.writerow(csv_row)
-                file.flush()
-                os.fsync(file.fileno())
-                counter += 1
-    
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        
-    finally:
-        scraper.close()
-
-
-
-def main():
-    scraper = FlashscoreBasketballScraper(headless=True)
-    path = r"C:\Users\HP\source\repos\Rehoboam\Rehoboam\Data\Basketball"
-    
-    try:
-        field_names = [
-                    "DATE",
-                    "HOME", "AWAY", 
-                    "H_SCORE", "A_SCORE", 
-                    "H_FGA", "A_FGA",
-                    "H_FG", "A_FG",
-                    "H_FG%", "A_FG%",
-                    "H_2FGA", "A_2FGA",
-                    "H_2FG", "A_2FG",
-                    "H_2FG%", "A_2FG%",
-                    "H_3FGA", "A_3FGA",
-                    "H_3FG", "A_3FG",
-                    "H_3FG%", "A_3FG%",
-                    "H_FTA", "A_FTA",
-                    "H_FT", "A_FT",
-                    "H_FT%", "A_FT%",
-                    "H_OREB", "A_OREB",
-                    "H_DREB", "A_DREB",
-                    "H_TREB", "A_TREB",
-                    "H_AST", "A_AST",
-                    "H_BLKS", "A_BLKS",
-                    "H_TOV", "A_TOV",
-                    "H_STL", "A_STL",
-                    "H_P_FOULS", "A_P_FOULS",
-                    "H_OFF_RATING", "A_OFF_RATING",
-                    "H_DEF_RATING", "A_DEF_RATING",
-                    "TOTAL"
-                ]
-        
-        country = "usa"
-        league = "nba"
-        seasons = ["2019/2020"] #, "2024/2025", "2023/2024", "2022/2023", "2021/2022"]
-        # seasons = ["2025"] #, "2024/2025", "2023/2024", "2022/2023", "2021/2022"]
-        folder = os.path.join(path, league)
-        os.makedirs(folder, exist_ok=True)
-
-        available_seasons, links = scraper.get_seasons_list(country, league)
-        threads = []
-
-        for season in seasons:
-            for season_text, link in zip(available_seasons, links):
-                if season in season_text:
-                    worker = Thread(target=season_scraper, args=(link, season, folder, field_names,))
-                    threads.append(worker)
-                    break
-            else:
-                print("No matching seasons found")
-            
-        for thread in threads:
-            thread.start()
-
-        for thread in threads:
-            thread.join()
-        
-    except KeyboardInterrupt:
-        print("\nScraping interrupted by user")
-    except Exception as e:
-        print(f"Error: {e}")
-    finally:
-        scraper.close()
-
-if __name__ == "__main__":
-    main()
-
-
-
-
-
-
-
-#########################################################################################################
-
-
+            self.idle.put(driver)
 
+    def _quit(self, driver):
+        with self.lock:
+            self.uses.pop(driver, None)
+            self.live -= 1
+        with suppress(Exception):
+            driver.quit()
 
+    def close(self):
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except Empty:
+                break
+            self._quit(driver)
 
-
-#update scraper
-
-import time
-import os
-import csv
-import pandas as pd
-from io import StringIO
-from datetime import datetime
-from typing import Dict, List
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from contextlib import suppress
-from threading import Thread
-from datetime import datetime
+    def report(self) -> str:
+        with self.lock:
+            stats = dict(self.stats)
+        checkouts = stats["hits"] + stats["misses"]
+        hit_rate = (stats["hits"] / checkouts * 100) if checkouts else 0.0
+        avg_startup = (stats["startup_time"] / stats["startups"]) if stats["startups"] else 0.0
+        return (f"Stats driver pool: {checkouts} checkouts, {stats['hits']} hits, {stats['misses']} misses "
+                f"({hit_rate:.1f}% hit rate), {stats['recycled']} recycled, {stats['crashed']} crashed, "
+                f"{stats['startups']} browser startups ({stats['startup_time']:.1f}s total, {avg_startup:.2f}s avg)")
 
 
 class FlashscoreBasketballScraper:
-    def __init__(self, headless: bool = True, delay: float = 2.0):
+    def __init__(self, headless: bool = True, delay: float = 2.0, stats_pool_size: int = 1, stats_driver_max_uses: int = 100, lean: bool = False,
+                 backend: str = "browser"):
         self.base_url = "https://www.flashscore.com"
         self.delay = delay
         self.driver = None
         self.stats_driver = None
         self.headless = headless
+        self.lean = lean
         
         # Headers to mimic real browser
         self.headers = {
@@ -443,6 +164,15 @@ class FlashscoreBasketballScraper:
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
+
+        # Warm browsers for the statistics pages, reused across matches
+        self.stats_pool = StatsDriverPool(self.setup_driver, stats_pool_size, stats_driver_max_uses)
+
+        # "http" reads finished matches from the page feeds without a browser (experimental)
+        self.http_archive = FlashscoreHttpArchive(self.headers, self.base_url) if backend == "http" else None
+        if self.http_archive is not None:
+            print("WARNING: the http backend is experimental and not yet checked against the live feeds, "
+                  "compare a season with the browser backend before relying on it.")
         
     def setup_driver(self) -> webdriver.Chrome:
         chrome_options = Options()
@@ -454,8 +184,13 @@ class FlashscoreBasketballScraper:
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_argument(f"user-agent={self.headers['User-Agent']}")
+        # Skip images, fonts, media and ad/analytics hosts, we only read text
+        if self.lean:
+            apply_lean_profile(chrome_options)
         
         driver = webdriver.Chrome(options=chrome_options)
+        if self.lean:
+            start_lean_session(driver)
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         return driver
     
@@ -470,12 +205,8 @@ class FlashscoreBasketballScraper:
             self.driver = self.setup_driver()
             
         try:
-            self.driver.get(archive_url) 
-            with suppress(Exception):
-                accept_button = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-                )
-                accept_button.click()
+            load_page(self.driver, archive_url)
+            dismiss_consent(self.driver)
 
             time.sleep(3)
             
@@ -499,9 +230,12 @@ class FlashscoreBasketballScraper:
         
 
     def get_season_matches(self, link: str, saved_count: int):
+        if self.http_archive:
+            return self.http_archive.get_season_matches(link, saved_count)
+
         link = link + "results/"
         print(link)
-        self.driver.get(link)
+        load_page(self.driver, link)
         time.sleep(3)
         while True:
             try:
@@ -578,46 +312,36 @@ class FlashscoreBasketballScraper:
 
 
     def get_match_statistics(self, link: str):
-        alt_name = {
-            "Field goals attempts": "FGA",
-            "Field goals made": "FG",
-            "Field goals %": "FG%",
-            "2-point field goals attempts": "2FGA",
-            "2-point field goals made": "2FG",
-            "2-point field goals %": "2FG%",
-            "3-point field goals attempts": "3FGA",
-            "3-point field goals made": "3FG",
-            "3-point field goals %": "3FG%",
-            "Free throws attempts": "FTA",
-            "Free throws made": "FT",
-            "Free throws %": "FT%",
-            "Offensive rebounds": "OREB",
-            "Defensive rebounds": "DREB",
-            "Total rebounds": "TREB",
-            "Assists": "AST",
-            "Blocks": "BLKS",
-            "Turnovers": "TOV",
-            "Steals": "STL",
-            "Personal fouls": "P_FOULS"
-        }
+        alt_name = STAT_NAMES
+
+        # Only finished matches reach the results list, so their statistics never change. A page
+        # read before it had fully rendered is never cached, it would fail build_season_row on every run
+        cached = page_cache.get("stats", link)
+        if cached is not None and stats_complete(cached):
+            return cached
+
+        if self.http_archive:
+            result_dict = self.http_archive.get_match_statistics(link, alt_name)
+            if stats_complete(result_dict):
+                page_cache.put("stats", link, result_dict)
+            return result_dict
 
-        self.stats_driver = self.setup_driver()
+        stats_driver = self.stats_pool.acquire()
+        failed = False
         result_dict = {}
 
         try:
-            self.stats_driver.get(link)
-            with suppress(Exception):
-                WebDriverWait(self.stats_driver, 5).until(
-                    EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-                ).click()
+            # Both page loads are governed like any other Flashscore request
+            load_page(stats_driver, link)
+            dismiss_consent(stats_driver)
             time.sleep(3)
-            buttons = self.stats_driver.find_elements(By.CSS_SELECTOR, "div.filterOver.filterOver--indent > div > a")
+            buttons = stats_driver.find_elements(By.CSS_SELECTOR, "div.filterOver.filterOver--indent > div > a")
 
             stats_link = buttons[2].get_attribute("href")
             # print(f"stats link = {stats_link}")
-            self.stats_driver.get(stats_link)
+            load_page(stats_driver, stats_link)
             time.sleep(3)
-            statistic_rows = self.stats_driver.find_elements(By.CSS_SELECTOR, "div.section > div.wcl-row_2oCpS")
+            statistic_rows = stats_driver.find_elements(By.CSS_SELECTOR, "div.section > div.wcl-row_2oCpS")
             for row in statistic_rows:
                 category_list = row.find_elements(By.CSS_SELECTOR, "div.wcl-category_Ydwqh > div")
 
@@ -637,12 +361,18 @@ class FlashscoreBasketballScraper:
                 away_stats_name = "A_" + alt_name[category]
                 result_dict.update({home_stats_name : home_value})
                 result_dict.update({away_stats_name : away_value})
+            page_weight.record(stats_driver, link)
 
         except Exception as e:
             print(f"Error: {e}")
+            # Browser-level failures retire the driver, a slow page or one with missing rows doesn't
+            failed = classify_failure(e) == "browser"
         else:
-            self.stats_driver.close()
+            if stats_complete(result_dict):
+                page_cache.put("stats", link, result_dict)
             return result_dict
+        finally:
+            self.stats_pool.release(stats_driver, failed)
 
         return {}
 
@@ -650,6 +380,9 @@ class FlashscoreBasketballScraper:
     def close(self) -> None:
         if self.driver:
             self.driver.quit()
+        self.stats_pool.close()
+        if self.http_archive:
+            self.http_archive.close()
 
 
 
@@ -666,98 +399,213 @@ def date_compare_less(date1, date2, year):
 
 
 
-def season_scraper(link: str, season_text: str, folder: str, field_names: List[str]):
+# Statistics build_season_row reads for both sides
+REQUIRED_STATS = ("FGA", "FTA", "OREB", "TOV")
+
+def stats_complete(match_stats: Dict[str, str]) -> bool:
+    return bool(match_stats) and all(f"{side}_{stat}" in match_stats for stat in REQUIRED_STATS for side in ("H", "A"))
+
+
+def build_season_row(match: Dict[str, str], match_stats: Dict[str, str], field_names: List[str]) -> List[str]:
+    h_score, a_score = float(match["H_SCORE"]), float(match["A_SCORE"])
+    h_fga, h_fta, h_oreb, h_tov = float(match_stats["H_FGA"]), float(match_stats["H_FTA"]), float(match_stats["H_OREB"]), float(match_stats["H_TOV"])
+    a_fga, a_fta, a_oreb, a_tov = float(match_stats["A_FGA"]), float(match_stats["A_FTA"]), float(match_stats["A_OREB"]), float(match_stats["A_TOV"])
+
+    home_possession = h_fga + 0.44 * h_fta - h_oreb + h_tov
+    away_possession = a_fga + 0.44 * a_fta - a_oreb + a_tov
+
+    h_off_rating = str(round((h_score / home_possession) * 100, 2))
+    a_off_rating = str(round((a_score / away_possession) * 100, 2))
+    h_def_rating = str(round((a_score / home_possession) * 100, 2))
+    a_def_rating = str(round((h_score / away_possession) * 100, 2))
+    total_score = str(h_score + a_score)
+
+    csv_row = {key: value for key, value in match.items() if key != "link"}
+    csv_row.update(match_stats)
+    csv_row.update({
+        "H_OFF_RATING": h_off_rating,
+        "A_OFF_RATING": a_off_rating,
+        "H_DEF_RATING": h_def_rating,
+        "A_DEF_RATING": a_def_rating,
+        "TOTAL": total_score
+    })
+
+    return [csv_row.get(col, '') for col in field_names]
+
+
+
+async def fetch_season_statistics(scraper, season_matches: List[Dict[str, str]], on_result,
+                                  concurrency: int = 4):
+    '''
+    Fetches the statistics of every match with up to `concurrency` requests in flight; how many of
+    those actually reach a host at once is left to the rate governor. on_result(index, match,
+    match_stats) is called as each match completes, in completion order, so rows can be written as
+    they arrive. The fetchers themselves are blocking (browser pool or HTTP session) and run in
+    worker threads.
+    '''
+    in_flight = asyncio.Semaphore(concurrency)
+    total = len(season_matches)
+    start = time.perf_counter()
+
+    async def fetch(index, match):
+        async with in_flight:
+            match_stats = await asyncio.to_thread(scraper.get_match_statistics, match["link"])
+        return index, match_stats
+
+    tasks = [asyncio.create_task(fetch(index, match)) for index, match in enumerate(season_matches)]
+    done = 0
+    for next_result in asyncio.as_completed(tasks):
+        index, match_stats = await next_result
+        done += 1
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        print(f'Fetched match {done}/{total}, {rate:.2f} matches/s, ETA {eta / 60:.1f} min \r', end='')
+        on_result(index, season_matches[index], match_stats)
+
+
+
+class SeasonCheckpoint:
+    """
+    Commits finished rows to the season archive every `every` matches. Matches are scraped oldest
+    first and only an unbroken run from the oldest one is committed, together with the id of the
+    newest match in it, so a restarted run picks up right after the last committed match. The run
+    ends at the first match whose statistics couldn't be fetched, that match and everything after
+    it are scraped again by the next run.
+    """
+    def __init__(self, archive: SeasonArchive, every: int = 50):
+        self.archive = archive
+        self.every = max(every, 1)
+        self.finished = {}
+        self.next_index = 0
+        self.pending = []
+        self.last_match_id = None
+        self.failed_match = None
+        self.rows_committed = 0
+
+    def add(self, index: int, match: Dict[str, str], row: List[str] = None):
+        # row is None for a match whose statistics couldn't be fetched
+        self.finished[index] = (match, row)
+        while self.failed_match is None and self.next_index in self.finished:
+            match, row = self.finished.pop(self.next_index)
+            if row is None:
+                self.failed_match = match
+                print(f"\nWARNING: Nothing after {match['HOME']} - {match['AWAY']} is committed, the next run retries from there.")
+                break
+            self.pending.append(row)
+            self.last_match_id = match_id_from_link(match["link"]) or self.last_match_id
+            self.next_index += 1
+        if len(self.pending) >= self.every:
+            self.commit()
+
+    def commit(self):
+        if not self.pending and self.last_match_id in (None, self.archive.manifest.get("last_match_id")):
+            return
+        # The archive keeps every segment newest first
+        self.archive.append(self.pending[::-1], self.last_match_id)
+        self.rows_committed += len(self.pending)
+        self.pending = []
+
+
+def season_scraper(link: str, season_text: str, folder: str, field_names: List[str], lean: bool = False,
+                   backend: str = "browser", concurrency: int = 1, checkpoint_every: int = 50):
     try:
-        scraper = FlashscoreBasketballScraper(headless=True)
-        scraper.driver = scraper.setup_driver()
+        scraper = FlashscoreBasketballScraper(headless=True, lean=lean, backend=backend, stats_pool_size=concurrency)
+        if backend == "browser":
+            scraper.driver = scraper.setup_driver()
         
         yr1, yr2 = season_text.split('/')[0], season_text.split('/')[1]
         csv_file = os.path.join(folder, f"{yr1}-{yr2}.csv")
         
-        old_rows = []
-        new_rows = []
-        
-        if os.path.exists(csv_file):
-            with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                
-                for row in reader:
-                    old_rows.append([row[col] for col in field_names])
+        # Rows live in the league/season archive, the CSV is an export of it
+        archive = SeasonArchive(os.path.join(os.path.dirname(folder), "archive"), os.path.basename(folder),
+                                f"{yr1}-{yr2}", field_names)
+        if archive.count() == 0 and os.path.exists(csv_file):
+            archive.import_csv(csv_file)
         
-        saved_count = len(old_rows)
-        print(f"Loaded {saved_count} existing rows from disk.")
+        saved_count = archive.count()
+        last_match_id = archive.manifest.get("last_match_id")
+        print(f"Archive holds {saved_count} rows.")
+
+        season_matches = None
+        if last_match_id:
+            # Resume right after the newest committed match
+            all_matches, _ = scraper.get_season_matches(link, 0)
+            match_ids = [match_id_from_link(match["link"]) for match in all_matches]
+            if last_match_id in match_ids:
+                season_matches = all_matches[:match_ids.index(last_match_id)]
+            else:
+                print(f"Last committed match {last_match_id} is not on the results page, resuming by row count.")
+        if season_matches is None:
+            season_matches, _ = scraper.get_season_matches(link, saved_count)
 
-        season_matches, total_count = scraper.get_season_matches(link, saved_count)
-        
+        # Oldest first, so a checkpoint always holds the oldest matches not yet saved
+        season_matches = season_matches[::-1]
+        checkpoint = SeasonCheckpoint(archive, checkpoint_every)
         print(f"Starting scrape for {len(season_matches)} new matches...")
         
-        current_count = 0
-        for match in season_matches:
-            current_count += 1
-            print(f'Fetching match {current_count}/{total_count} \r', end='')
-            
-            match_stats = scraper.get_match_statistics(match["link"]) 
-            if not match_stats:
-                 print(f"WARNING: Could not fetch stats for match. Skipping.")
-                 continue
-
-            del match["link"]
-            
-            h_score, a_score = float(match["H_SCORE"]), float(match["A_SCORE"])
-            h_fga, h_fta, h_oreb, h_tov = float(match_stats["H_FGA"]), float(match_stats["H_FTA"]), float(match_stats["H_OREB"]), float(match_stats["H_TOV"])
-            a_fga, a_fta, a_oreb, a_tov = float(match_stats["A_FGA"]), float(match_stats["A_FTA"]), float(match_stats["A_OREB"]), float(match_stats["A_TOV"])
-
-            home_possession = h_fga + 0.44 * h_fta - h_oreb + h_tov
-            away_possession = a_fga + 0.44 * a_fta - a_oreb + a_tov
-
-            h_off_rating = str(round((h_score / home_possession) * 100, 2))
-            a_off_rating = str(round((a_score / away_possession) * 100, 2))
-            h_def_rating = str(round((a_score / home_possession) * 100, 2))
-            a_def_rating = str(round((h_score / away_possession) * 100, 2))
-            total_score = str(h_score + a_score)
-
-            csv_row = {}
-            csv_row.update(match)
-            csv_row.update(match_stats)
-            csv_row.update({
-                "H_OFF_RATING": h_off_rating,
-                "A_OFF_RATING": a_off_rating,
-                "H_DEF_RATING": h_def_rating,
-                "A_DEF_RATING": a_def_rating,
-                "TOTAL": total_score
-            })
-            
-            new_row = [csv_row.get(col, '') for col in field_names]
-            print(new_row)
-            new_rows.append(new_row)
-
-        print(f"\nFinished scraping {len(new_rows)} new matches.")
-        
-        
-        output_buffer = StringIO(newline='')
-        writer = csv.writer(output_buffer)
+        try:
+            if concurrency <= 1:
+                for index, match in enumerate(season_matches):
+                    print(f'Fetching match {index + 1}/{len(season_matches)} \r', end='')
+                    
+                    match_stats = scraper.get_match_statistics(match["link"]) 
+                    if not match_stats:
+                        print("WARNING: Could not fetch stats for match.")
+                        # Nothing after it can be committed this run
+                        checkpoint.add(index, match)
+                        break
+
+                    new_row = build_season_row(match, match_stats, field_names)
+                    print(new_row)
+                    checkpoint.add(index, match, new_row)
+            else:
+                # Matches finish out of order, the checkpoint only commits once the gaps fill in
+                def on_result(index, match, match_stats):
+                    if not match_stats:
+                        print(f"\nWARNING: Could not fetch stats for {match['HOME']} - {match['AWAY']}.")
+                        checkpoint.add(index, match)
+                        return
+                    checkpoint.add(index, match, build_season_row(match, match_stats, field_names))
 
-        writer.writerow(field_names)
+                asyncio.run(fetch_season_statistics(scraper, season_matches, on_result, concurrency))
+        finally:
+            # Also runs when the scrape dies, everything finished in order so far is kept
+            checkpoint.commit()
 
-        writer.writerows(new_rows)
-        writer.writerows(old_rows)
-        
+        print(f"\nFinished scraping {checkpoint.rows_committed} new matches.")
         
-        with open(csv_file, 'w', newline='', encoding='utf-8') as outfile:
-            outfile.write(output_buffer.getvalue())
+        archive.compact()
+        if archive.needs_export(csv_file):
+            archive.export_csv(csv_file)
             
-        print(f"Successfully wrote {len(new_rows) + len(old_rows)} total rows to {csv_file}")
+        print(f"Successfully archived {checkpoint.rows_committed} new rows, {archive.count()} total rows in {csv_file}")
+        print(scraper.stats_pool.report())
+        print(page_cache.report())
+        if scraper.lean:
+            print(page_weight.report())
+        scraper.close()
             
     except Exception as e:
         print(f"An error occurred: {e}")
-        if 'scraper' in locals() and scraper.driver:
-            scraper.driver.quit()
+        if 'scraper' in locals():
+            scraper.close()
         return
 
 
 
 def main():
-    scraper = FlashscoreBasketballScraper(headless=True)
+    # Block images, fonts and ad hosts and report bytes transferred per page
+    lean = False
+    # "browser" drives Chrome through every match, "http" reads the page feeds directly (experimental)
+    backend = "browser"
+    # Statistics fetches kept in flight at once, 1 fetches one match after another
+    concurrency = 1
+    # Matches scraped between commits to the archive, a crash loses at most this many
+    checkpoint_every = 50
+    # Only recompute the advanced metrics of every archived season, no scraping
+    recompute_metrics = False
+    scraper = FlashscoreBasketballScraper(headless=True, lean=lean)
     path = r"C:\Users\HP\source\repos\Rehoboam\Rehoboam\Data\Basketball"
     
     try:
@@ -790,6 +638,10 @@ def main():
                     "TOTAL"
                 ]
         
+        if recompute_metrics:
+            recompute_seasons(os.path.join(path, "archive"), field_names)
+            return
+
         country = "usa"
         league = "nba"
 
@@ -808,7 +660,7 @@ def main():
                 break
         
         if link != None:
-            season_scraper(link, season, folder, field_names)
+            season_scraper(link, season, folder, field_names, lean, backend, concurrency, checkpoint_every)
         else:
             print("No matching seasons found")
 
@@ -818,6 +670,7 @@ def main():
     except Exception as e:
         print(f"Error: {e}")
     finally:
+        print(governor.report())
         scraper.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+'''
+Opt-in "lean" Chrome profile for the scrapers. We only ever read text from Flashscore pages, so
+images, media, fonts and third-party ad/analytics requests are blocked, and pages are handed back
+as soon as the DOM is ready (eager load strategy). Stylesheets are left alone because .text and
+innerText depend on them to leave hidden elements out.
+Cookie consent is also handled here, once per browser instead of once per navigation.
+'''
+import json
+import os
+import time
+from contextlib import suppress
+from threading import Lock
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+BLOCKED_URL_PATTERNS = [
+    # images
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.avif",
+    # media
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8",
+    # fonts
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # ads and analytics
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*", "*google-analytics.com*",
+    "*googletagservices.com*", "*adservice.google.*", "*amazon-adsystem.com*", "*adnxs.com*",
+    "*criteo.*", "*taboola.com*", "*outbrain.com*", "*scorecardresearch.com*", "*facebook.net*",
+    "*hotjar.com*", "*quantserve.com*", "*moatads.com*", "*pubmatic.com*", "*rubiconproject.com*",
+]
+
+
+def apply_lean_profile(options):
+    '''Adds the lean settings to a ChromeOptions object before the driver is started'''
+    options.page_load_strategy = 'eager'
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.default_content_setting_values.notifications': 2,
+        'profile.default_content_setting_values.geolocation': 2,
+    })
+    # The performance log carries Network.loadingFinished events, used to measure page weight
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def start_lean_session(driver):
+    '''Turns on request blocking for a driver started with apply_lean_profile()'''
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+
+
+class PageWeight:
+    """
+    Bytes transferred per page, read from the Chrome performance log. Every record() call drains
+    the log, so the bytes counted are everything the session downloaded since the previous call.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.pages = []
+
+    def record(self, driver, label):
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            # Not a lean driver, performance logging is off
+            return None
+
+        transferred = 0
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            if message.get('method') == 'Network.loadingFinished':
+                transferred += message['params'].get('encodedDataLength', 0)
+
+        with self.lock:
+            self.pages.append((label, transferred))
+        return transferred
+
+    def report(self) -> str:
+        with self.lock:
+            pages = list(self.pages)
+        if not pages:
+            return "Page weight: nothing recorded"
+        total = sum(size for _, size in pages)
+        label, largest = max(pages, key=lambda page: page[1])
+        return (f"Page weight: {len(pages)} pages, {total / 1048576:.1f} MB transferred, "
+                f"{total / len(pages) / 1024:.0f} KB avg, largest {largest / 1024:.0f} KB ({label})")
+
+
+page_weight = PageWeight()
+
+
+# Consent cookies saved after the first accepted banner, injected into every later browser
+CONSENT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "consent_cookies.json")
+CONSENT_COOKIE_PREFIXES = ("Optanon", "eupubconsent")
+# Only set once the banner has been answered; OptanonConsent is there from the first page load
+CONSENT_COOKIE = "OptanonAlertBoxClosed"
+COOKIE_FIELDS = ("name", "value", "domain", "path", "expiry", "secure", "httpOnly", "sameSite")
+
+consent_lock = Lock()
+consented_sessions = set()
+
+
+def has_consent(cookies) -> bool:
+    return any(cookie['name'] == CONSENT_COOKIE for cookie in cookies)
+
+
+def load_consent_cookies():
+    # Nothing when the saved answer has expired
+    cookies = []
+    with suppress(Exception):
+        with open(CONSENT_FILE, 'r', encoding='utf-8') as file:
+            cookies = json.load(file)
+    now = time.time()
+    cookies = [cookie for cookie in cookies if cookie.get('expiry') is None or cookie['expiry'] > now]
+    return cookies if has_consent(cookies) else []
+
+
+def save_consent_cookies(driver):
+    cookies = [{key: cookie[key] for key in COOKIE_FIELDS if key in cookie}
+               for cookie in driver.get_cookies() if cookie['name'].startswith(CONSENT_COOKIE_PREFIXES)]
+    if not has_consent(cookies):
+        return
+    temp_file = CONSENT_FILE + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as file:
+        json.dump(cookies, file)
+    os.replace(temp_file, CONSENT_FILE)
+
+
+def inject_consent_cookies(driver) -> bool:
+    saved_cookies = load_consent_cookies()
+    if not saved_cookies:
+        return False
+    for cookie in saved_cookies:
+        with suppress(Exception):
+            driver.add_cookie(cookie)
+    # A cookie the browser rejects (another domain, a changed banner) leaves it without consent
+    if not has_consent(driver.get_cookies()):
+        return False
+    # The banner on the page that is already loaded stays until the next navigation
+    driver.execute_script("const sdk = document.getElementById('onetrust-consent-sdk'); if (sdk) sdk.remove();")
+    return True
+
+
+def dismiss_consent(driver, timeout = 5):
+    '''
+    Handles the onetrust cookie banner once per browser. The first browser that sees it clicks
+    accept and saves the consent cookies; later browsers get those cookies injected instead of
+    waiting for the banner. Once a browser has consented, every later call returns immediately.
+    '''
+    with consent_lock:
+        if driver.session_id in consented_sessions:
+            return
+
+    consented = has_consent(driver.get_cookies()) or inject_consent_cookies(driver)
+    if not consented:
+        try:
+            accept_button = WebDriverWait(driver, timeout).until(
+                EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
+            )
+        except Exception:
+            # No banner on this page, there is no point waiting for it again
+            consented = True
+        else:
+            with suppress(Exception):
+                accept_button.click()
+                WebDriverWait(driver, timeout).until(lambda d: has_consent(d.get_cookies()))
+            # A click that didn't register is retried on the next navigation
+            if has_consent(driver.get_cookies()):
+                save_consent_cookies(driver)
+                consented = True
+
+    if consented:
+        with consent_lock:
+            consented_sessions.add(driver.session_id)
@@ -0,0 +1,178 @@
+'''
+Bulk extraction of the fixture rows on a Flashscore listing page (basketball, hockey, tennis).
+Every event__match row is read in a single in-page script call, together with the text of the
+league header it sits under, so filtering happens in Python instead of over hundreds of
+WebDriver round-trips per page.
+'''
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from page_waits import wait_for
+
+# Headers and rows come back from querySelectorAll in document order, so one walk assigns
+# every row to its league block, with no per-row preceding:: lookups
+LEAGUE_HEADERS_SCRIPT = """
+const headerClass = arguments[0];
+const headers = [];
+let header = null;
+for (const node of document.querySelectorAll('div[class*="' + headerClass + '"]')) {
+    // Nested parts of the current header also match the class filter
+    if (header && header.contains(node)) continue;
+    header = node;
+    headers.push(node.innerText.trim());
+}
+return headers;
+"""
+
+FIXTURE_ROWS_SCRIPT = """
+const headerClass = arguments[0];
+const wantedBlocks = new Set(arguments[1]);
+const nodes = document.querySelectorAll('div[class*="' + headerClass + '"], .event__match');
+const text = (root, selector) => {
+    const node = root.querySelector(selector);
+    return node ? node.innerText.trim() : '';
+};
+const rows = [];
+let header = null;
+let headerText = '';
+let block = -1;
+for (const node of nodes) {
+    if (!node.classList.contains('event__match')) {
+        if (header && header.contains(node)) continue;
+        header = node;
+        headerText = node.innerText.trim();
+        block += 1;
+        continue;
+    }
+    if (header === null) continue;
+    // Rows of unwanted league blocks are skipped without reading anything inside them
+    if (!wantedBlocks.has(block)) continue;
+    const teams = node.querySelectorAll('.event__participant');
+    const link = node.querySelector('.eventRowLink');
+    rows.push({
+        header: headerText,
+        block: block,
+        home: teams.length > 0 ? teams[0].innerText.trim() : '',
+        away: teams.length > 1 ? teams[1].innerText.trim() : '',
+        time: text(node, '.event__time'),
+        link: link ? link.href : '',
+        live: node.querySelector('.event__stage') !== null
+    });
+}
+return rows;
+"""
+
+
+def iter_league_fixtures(driver, header_class, classify):
+    '''
+    Single-pass listing filter. The league headers are read first and classify(header_text) is called
+    once per block; it must return a tuple whose first item says whether the block is wanted, like
+    is_desired_league_header. The rows under every wanted header are then read in one script call
+    and yielded as (row, classification) pairs in page order, row being
+    {'header', 'block', 'home', 'away', 'time', 'link', 'live'}.
+    '''
+    headers = driver.execute_script(LEAGUE_HEADERS_SCRIPT, header_class) or []
+    classified = [classify(header) for header in headers]
+    wanted_blocks = [block for block, result in enumerate(classified) if result[0]]
+    if not wanted_blocks:
+        return
+
+    for row in driver.execute_script(FIXTURE_ROWS_SCRIPT, header_class, wanted_blocks) or []:
+        block = row['block']
+        # The listing can re-render between the two calls, only keep rows whose header still matches
+        if block < len(headers) and headers[block] == row['header']:
+            yield row, classified[block]
+
+
+# The day picker's date label, and a signature of the rows shown: both change once the listing has
+# moved to another day
+DAY_LABEL_SELECTOR = "[data-testid='wcl-dayPicker'], .calendar__datepicker"
+LISTING_STATE_SCRIPT = """
+const label = document.querySelector(arguments[0]);
+const rows = document.querySelectorAll('.event__match');
+return {
+    date: label ? label.innerText.trim() : null,
+    rows: rows.length ? rows.length + ':' + rows[0].id + ':' + rows[rows.length - 1].id : null
+};
+"""
+
+
+def listing_state(driver):
+    return driver.execute_script(LISTING_STATE_SCRIPT, DAY_LABEL_SELECTOR) or {'date': None, 'rows': None}
+
+
+def listing_ready(driver):
+    # Holds once the listing shows fixture rows
+    state = listing_state(driver)
+    return state if state['rows'] else False
+
+
+def listing_moved(previous):
+    # Holds once other rows are showing and, when the picker has a date label, it shows another date
+    def condition(driver):
+        state = listing_state(driver)
+        if state['rows'] is None or state['rows'] == previous['rows']:
+            return False
+        if previous['date'] is not None and state['date'] == previous['date']:
+            return False
+        return state
+    return condition
+
+
+def iter_listing_days(driver, days, next_selector, timeout = 10):
+    '''
+    Walks the day picker of a listing page that is showing today forward through the day offsets in
+    `days`, yielding each offset once its listing is showing, so a range of days is read in one page
+    session. next_selector is the sport's next-day button. Today's rows are waited for before the
+    first click, a day counts as loaded once the picker's date and the rows shown have both changed.
+    A day without fixtures waits out the timeout; if the picker's date didn't move either, the walk stops.
+    '''
+    # Rows still rendering after the page load would otherwise be taken for the next day's
+    state = wait_for(driver, "listing rows", listing_ready, timeout=timeout) or listing_state(driver)
+    current = 0
+    for day in sorted(set(days)):
+        while current < day:
+            next_button = wait_for(driver, "day picker", EC.presence_of_element_located((By.CSS_SELECTOR, next_selector)), timeout=timeout)
+            if next_button is None:
+                print(f"Day picker {next_selector} not found, stopping at day {current}")
+                return
+            driver.execute_script("arguments[0].click();", next_button)
+            current += 1
+            moved = wait_for(driver, "next day listing", listing_moved(state), timeout=timeout)
+            if moved is None:
+                moved = listing_state(driver)
+                if state['date'] is not None and moved['date'] == state['date']:
+                    print(f"Day picker didn't move past day {current - 1}, stopping")
+                    return
+            state = moved
+        yield day
+
+
+H2H_ROWS_SCRIPT = """
+const rows = [];
+for (const row of arguments[0].querySelectorAll('.h2h__row')) {
+    const text = (selector) => {
+        const node = row.querySelector(selector);
+        return node ? node.innerText.trim() : '';
+    };
+    const score = text('.h2h__result').split(/\\s+/).filter(part => part.length > 0);
+    rows.push({
+        link: row.href || '',
+        date: text('.h2h__date'),
+        home: text('.h2h__homeParticipant'),
+        away: text('.h2h__awayParticipant'),
+        league: text('.h2h__event'),
+        home_score: score.length > 0 ? score[0] : '0',
+        away_score: score.length > 1 ? score[1] : '0'
+    });
+}
+return rows;
+"""
+
+
+def extract_h2h_rows(driver, section):
+    '''
+    Returns one dict per h2h__row of an H2H section, newest first:
+    {'link', 'date', 'home', 'away', 'league', 'home_score', 'away_score'}.
+    '''
+    return driver.execute_script(H2H_ROWS_SCRIPT, section) or []
@@ -0,0 +1,192 @@
+'''
+Three-stage fixture pipeline shared by the basketball, hockey and tennis mains. Discovery runs on
+the calling thread and feeds fixtures into a bounded queue as the listing is read, scrape workers
+(each with its own driver) turn them into output blocks, and a single writer thread appends the
+blocks to their files. The bounded queues keep discovery from running far ahead of the workers and
+the workers from running far ahead of the disk. `workers` is only a ceiling: every page load a
+scrape makes holds one of the rate governor's slots for its host, so how many browsers load at once
+follows how the site responds.
+
+With a scheduler (fixture_scheduler.FixtureScheduler) the fixture queue becomes an unbounded
+priority queue, so workers always take the most urgent fixture discovered so far.
+
+Blocks are written in completion order, not listing order, so a scheduled urgent fixture never
+waits on the write of an earlier one. Nothing reading the files depends on the order: the C++
+readers (read_and_process_quaters_file, process_tennis_file) parse every block on its own. A fixture
+whose scrape fails is never written, so it isn't marked done in the run manifest and is picked up
+again by the next run.
+'''
+import itertools
+import queue
+import time
+from contextlib import suppress
+from threading import Lock, Thread
+
+from retry_policy import classify_failure
+
+# Marks the end of a queue, one per consumer
+STOP = object()
+# Sorts after every fixture in a scheduled queue
+STOP_KEY = (float('inf'), float('inf'))
+# Fixtures or blocks allowed to wait between two stages
+QUEUE_SIZE = 16
+# Blocks the writer appends per pass, grouped by output file
+WRITE_BATCH = 8
+
+
+class FixturePipeline:
+    def __init__(self, format_block, scrape = None, workers = 1, driver_factory = None, manifest = None,
+                 queue_size = QUEUE_SIZE, write_batch = WRITE_BATCH, scheduler = None):
+        '''
+        format_block(fixture, results) -> (output_file, text) or None to skip the fixture.
+        scrape(driver, fixture) -> results; without it format_block gets None as results.
+        driver_factory() starts a worker's driver the first time that worker needs one.
+        scheduler orders the scrapes by deadline and learns their cost.
+        '''
+        self.format_block = format_block
+        self.scrape = scrape
+        self.workers = max(1, workers)
+        self.driver_factory = driver_factory
+        self.manifest = manifest
+        self.queue_size = queue_size
+        self.write_batch = write_batch
+        self.scheduler = scheduler
+        self.order = itertools.count()
+
+        self.lock = Lock()
+        self.drivers = []
+        self.discovered = 0
+        self.skipped = 0
+        self.failed = 0
+        self.shed = 0
+        self.written = 0
+        self.start_time = None
+        self.first_write = None
+
+    def run(self, fixtures) -> int:
+        '''Consumes the fixtures iterable and returns the number of blocks written'''
+        self.start_time = time.perf_counter()
+        fixture_queue = queue.PriorityQueue() if self.scheduler is not None else queue.Queue(maxsize=self.queue_size)
+        block_queue = queue.Queue(maxsize=self.queue_size)
+        workers = [Thread(target=self.scrape_worker, args=(fixture_queue, block_queue), daemon=True)
+                   for _ in range(self.workers)]
+        writer = Thread(target=self.writer, args=(block_queue,), daemon=True)
+        for thread in workers + [writer]:
+            thread.start()
+
+        try:
+            # Discovery stays on this thread, it owns the listing driver
+            for fixture in fixtures:
+                if self.manifest is not None and self.manifest.is_done(fixture['link']):
+                    self.skipped += 1
+                    continue
+                self.discovered += 1
+                self.enqueue(fixture_queue, fixture)
+            if self.scheduler is not None:
+                with fixture_queue.mutex:
+                    queued = [item[2] for item in fixture_queue.queue if item[2] is not STOP]
+                self.scheduler.plan(queued, self.workers)
+        except Exception as e:
+            print(f"Error discovering fixtures: {e}")
+        finally:
+            for _ in workers:
+                self.enqueue(fixture_queue, STOP)
+            for thread in workers:
+                thread.join()
+            block_queue.put(STOP)
+            writer.join()
+            for driver in self.drivers:
+                with suppress(Exception):
+                    driver.quit()
+            if self.scheduler is not None:
+                self.scheduler.save()
+        return self.written
+
+    def enqueue(self, fixture_queue, fixture):
+        if self.scheduler is None:
+            fixture_queue.put(fixture)
+        else:
+            key = STOP_KEY if fixture is STOP else self.scheduler.sort_key(fixture)
+            fixture_queue.put((key, next(self.order), fixture))
+
+    def scrape_worker(self, fixture_queue, block_queue):
+        driver = None
+        while True:
+            fixture = fixture_queue.get()
+            if self.scheduler is not None:
+                fixture = fixture[2]
+            if fixture is STOP:
+                return
+            if self.scheduler is not None and not self.scheduler.admit(fixture):
+                with self.lock:
+                    self.shed += 1
+                continue
+            try:
+                results = None
+                if self.scrape is not None:
+                    if self.driver_factory is not None and driver is None:
+                        driver = self.driver_factory()
+                        with self.lock:
+                            self.drivers.append(driver)
+                    scrape_start = time.perf_counter()
+                    results = self.scrape(driver, fixture)
+                    if self.scheduler is not None:
+                        self.scheduler.record(fixture, time.perf_counter() - scrape_start)
+                block = self.format_block(fixture, results)
+            except Exception as e:
+                kind = classify_failure(e)
+                print(f"Error scraping {fixture.get('link')} ({kind}): {e}")
+                with self.lock:
+                    self.failed += 1
+                if kind == "browser" and driver is not None:
+                    # The driver itself broke, the next fixture gets a fresh one
+                    with self.lock:
+                        self.drivers.remove(driver)
+                    with suppress(Exception):
+                        driver.quit()
+                    driver = None
+                continue
+            if block:
+                block_queue.put((fixture, block))
+
+    def writer(self, block_queue):
+        stopping = False
+        while not stopping:
+            batch = [block_queue.get()]
+            # Whatever else is already waiting goes out in the same pass
+            while len(batch) < self.write_batch:
+                try:
+                    batch.append(block_queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(item is STOP for item in batch)
+
+            by_file = {}
+            for item in batch:
+                if item is not STOP:
+                    fixture, (output, text) = item
+                    by_file.setdefault(output, []).append((fixture, text))
+
+            for output, blocks in by_file.items():
+                try:
+                    with open(output, 'a') as fileObj:
+                        for fixture, text in blocks:
+                            if self.manifest is not None:
+                                fileObj.flush()
+                                self.manifest.begin(fixture['link'], output)
+                            fileObj.write(text)
+                            fileObj.flush()
+                            if self.manifest is not None:
+                                self.manifest.finish(fixture['link'])
+                            self.written += 1
+                            if self.first_write is None:
+                                self.first_write = time.perf_counter()
+                except Exception as e:
+                    print(f"Error writing to {output}: {e}")
+            print(f'{self.written}/{self.discovered}', '\r', end='')
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0
+        first = f"{self.first_write - self.start_time:.1f}s" if self.first_write else "never"
+        return (f"Pipeline: {self.written}/{self.discovered} fixtures written, {self.failed} failed, "
+                f"{self.shed} shed, {self.skipped} already done, first block after {first}, {elapsed:.1f}s in total")
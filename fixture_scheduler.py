@@ -0,0 +1,158 @@
+'''
+Deadline-aware ordering of fixture work. A fixture's deadline is its tip-off (the listing date
+plus game['time']) less DEADLINE_MARGIN, and the pipeline hands workers the fixture with the
+earliest deadline first, higher league priority first among equal deadlines.
+
+How long a fixture takes is estimated per league from past runs (scrape_costs.json). Once the
+listing is read, plan() projects when every queued fixture would finish with the workers available;
+a fixture projected to miss its tip-off is reported, and fixtures of leagues below shed_below
+queued ahead of it are dropped from the run until it fits. A low-priority fixture that can no
+longer finish before its own tip-off when a worker reaches it is dropped as well.
+'''
+import heapq
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from threading import Lock
+
+COSTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrape_costs.json")
+
+# Minutes before tip-off a fixture's block has to be written
+DEADLINE_MARGIN = 10
+# Seconds a fixture is assumed to take before anything has been measured
+DEFAULT_COST = 30.0
+# Weight of the newest measurement in a league's cost
+COST_WEIGHT = 0.3
+# League priority when the catalog doesn't give one
+DEFAULT_PRIORITY = 1
+
+
+def fixture_deadline(fixture, margin = DEADLINE_MARGIN):
+    '''Epoch seconds by which the fixture should be done, None when its time isn't a clock time'''
+    try:
+        tip_off = datetime.strptime(f"{fixture['date']} {fixture['time']}", '%Y-%m-%d %H:%M')
+    except (KeyError, ValueError):
+        return None
+    return (tip_off - timedelta(minutes=margin)).timestamp()
+
+
+class FixtureScheduler:
+    def __init__(self, sport, shed_below = DEFAULT_PRIORITY, margin = DEADLINE_MARGIN, path = COSTS_FILE):
+        self.sport = sport
+        self.shed_below = shed_below
+        self.margin = margin
+        self.path = path
+        self.lock = Lock()
+        self.costs = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                self.costs = json.load(file).get(sport, {})
+        except (FileNotFoundError, ValueError):
+            pass
+        self.shed = set()
+        self.late = set()
+
+    def priority(self, fixture) -> int:
+        return fixture.get('priority', DEFAULT_PRIORITY)
+
+    def deadline(self, fixture):
+        return fixture_deadline(fixture, self.margin)
+
+    def sort_key(self, fixture):
+        deadline = self.deadline(fixture)
+        return (float('inf') if deadline is None else deadline, -self.priority(fixture))
+
+    def cost(self, fixture) -> float:
+        with self.lock:
+            league_cost = self.costs.get(fixture.get('league'))
+            if league_cost is not None:
+                return league_cost[0]
+            if self.costs:
+                return sum(cost for cost, _ in self.costs.values()) / len(self.costs)
+        return DEFAULT_COST
+
+    def record(self, fixture, seconds):
+        league = fixture.get('league')
+        with self.lock:
+            cost, samples = self.costs.get(league, (seconds, 0))
+            self.costs[league] = ((1 - COST_WEIGHT) * cost + COST_WEIGHT * seconds if samples else seconds, samples + 1)
+
+    def save(self):
+        with self.lock:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    all_costs = json.load(file)
+            except (FileNotFoundError, ValueError):
+                all_costs = {}
+            all_costs[self.sport] = self.costs
+            temp_file = self.path + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as file:
+                json.dump(all_costs, file, indent=2)
+            os.replace(temp_file, self.path)
+
+    def project(self, fixtures, workers, start = None):
+        '''[(fixture, projected finish)] for fixtures taken in order by `workers` parallel workers'''
+        start = time.time() if start is None else start
+        free_at = [start] * max(1, workers)
+        projection = []
+        for fixture in fixtures:
+            begin = heapq.heappop(free_at)
+            finish = begin + self.cost(fixture)
+            heapq.heappush(free_at, finish)
+            projection.append((fixture, finish))
+        return projection
+
+    def plan(self, fixtures, workers, start = None):
+        '''
+        Projects the queued fixtures (in queue order) and sheds low-priority work ahead of any
+        fixture that would miss its deadline. Returns the fixtures still projected to be late.
+        '''
+        remaining = sorted((fixture for fixture in fixtures if fixture['link'] not in self.shed), key=self.sort_key)
+        while True:
+            projection = self.project(remaining, workers, start)
+            missed = [(index, fixture) for index, (fixture, finish) in enumerate(projection)
+                      if self.deadline(fixture) is not None and finish > self.deadline(fixture)]
+            sheddable = None
+            for index, fixture in missed:
+                # Drop the lowest-priority fixture that is queued ahead of the late one and outranked by it
+                candidates = [other for other in remaining[:index]
+                              if self.priority(other) < self.shed_below and self.priority(other) < self.priority(fixture)]
+                if candidates:
+                    sheddable = min(candidates, key=lambda other: (self.priority(other), -self.sort_key(other)[0]))
+                    break
+            if sheddable is None:
+                break
+            remaining.remove(sheddable)
+            self.shed.add(sheddable['link'])
+            print(f"Shedding {sheddable['league']} {sheddable['home']} - {sheddable['away']} ({sheddable['time']}), "
+                  f"it would make a higher priority fixture miss its tip-off")
+
+        late = [fixture for fixture, finish in self.project(remaining, workers, start)
+                if self.deadline(fixture) is not None and finish > self.deadline(fixture)]
+        for fixture in late:
+            print(f"Warning: {fixture['league']} {fixture['home']} - {fixture['away']} ({fixture['time']}) "
+                  f"is projected to finish after its tip-off")
+        return late
+
+    def admit(self, fixture, now = None) -> bool:
+        '''Called when a worker takes the fixture, False if it is dropped from the run'''
+        if fixture['link'] in self.shed:
+            return False
+        deadline = self.deadline(fixture)
+        now = time.time() if now is None else now
+        if deadline is not None and now + self.cost(fixture) > deadline:
+            if self.priority(fixture) < self.shed_below:
+                with self.lock:
+                    self.shed.add(fixture['link'])
+                print(f"Shedding {fixture['league']} {fixture['home']} - {fixture['away']} ({fixture['time']}), "
+                      f"it can't be done before tip-off")
+                return False
+            with self.lock:
+                self.late.add(fixture['link'])
+        return True
+
+    def report(self) -> str:
+        with self.lock:
+            return (f"Scheduler: {len(self.shed)} fixtures shed, {len(self.late)} started too late for their tip-off, "
+                    f"costs known for {len(self.costs)} leagues")
@@ -0,0 +1,77 @@
+'''
+League catalog shared by the basketball and hockey scrapers. Which leagues are scraped, their short
+codes and the file their fixtures are written to live in league_catalog.json; enabling a league is
+a matter of setting "desired" to true there. An optional "priority" (default 1, higher first) ranks
+leagues for the fixture scheduler; leagues below its shed_below may be dropped to keep others on time.
+
+Short code rules come in two kinds: {"name": ...} matches a league name exactly, {"prefix": ...}
+matches every league name starting with it, the longest matching prefix winning. Either kind can be
+narrowed with "country" (case-insensitive) and "contains". Names without a rule keep their own name.
+'''
+import json
+import os
+from collections import namedtuple
+from threading import Lock
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "league_catalog.json")
+
+LeagueInfo = namedtuple("LeagueInfo", ["desired", "code", "output", "priority"])
+
+DEFAULT_PRIORITY = 1
+
+
+class LeagueCatalog:
+    def __init__(self, config):
+        self.leagues = {entry['name']: entry for entry in config.get('leagues', [])}
+        self.default_output = config.get('default_output', "")
+        self.country_outputs = {country.lower(): output for country, output in config.get('country_outputs', {}).items()}
+
+        # (name, country) -> code, "" as the country matches every country
+        self.exact_codes = {}
+        # prefix -> [(country, contains, code)] in file order
+        self.prefix_codes = {}
+        for rule in config.get('codes', []):
+            country = rule.get('country', "").lower()
+            if 'name' in rule:
+                self.exact_codes.setdefault((rule['name'], country), rule['code'])
+            else:
+                self.prefix_codes.setdefault(rule['prefix'], []).append((country, rule.get('contains', ""), rule['code']))
+        self.prefix_lengths = sorted({len(prefix) for prefix in self.prefix_codes}, reverse=True)
+
+        # Every header is looked up once, the answer never changes within a run
+        self.lookups = {}
+
+    def short_code(self, league_name, country):
+        country = country.lower()
+        code = self.exact_codes.get((league_name, country)) or self.exact_codes.get((league_name, ""))
+        if code:
+            return code
+        for length in self.prefix_lengths:
+            for rule_country, contains, code in self.prefix_codes.get(league_name[:length], ()):
+                if (not rule_country or rule_country == country) and contains in league_name:
+                    return code
+        return league_name
+
+    def lookup(self, league_name, country) -> LeagueInfo:
+        key = (league_name, country)
+        info = self.lookups.get(key)
+        if info is None:
+            entry = self.leagues.get(league_name, {})
+            output = entry.get('output') or self.country_outputs.get(country.strip().lower(), self.default_output)
+            info = LeagueInfo(entry.get('desired', False), self.short_code(league_name, country), output,
+                              entry.get('priority', DEFAULT_PRIORITY))
+            self.lookups[key] = info
+        return info
+
+
+catalogs = {}
+catalogs_lock = Lock()
+
+
+def load_catalog(sport, path = CATALOG_FILE) -> LeagueCatalog:
+    '''Reads the sport's section of the catalog file the first time it is asked for'''
+    with catalogs_lock:
+        if (sport, path) not in catalogs:
+            with open(path, 'r', encoding='utf-8') as file:
+                catalogs[(sport, path)] = LeagueCatalog(json.load(file)[sport])
+        return catalogs[(sport, path)]
@@ -0,0 +1,130 @@
+'''
+On-disk cache for data read off finished-match pages. A finished match never changes, yet the same
+games come back in the H2H lists of every fixture a team plays for weeks, and in every archive
+rerun. Entries are stored under the hash of (kind, match id) as gzip-compressed JSON, and the
+least recently used ones are deleted once the cache grows past max_bytes.
+Only pages the caller knows are final go in; live and upcoming pages are never cached.
+'''
+import gzip
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from contextlib import suppress
+from threading import Lock
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "page_cache")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+MATCH_ID_PATTERNS = (re.compile(r"[?&]mid=([A-Za-z0-9]{8})"), re.compile(r"/match/([A-Za-z0-9]{8})(?:/|$)"))
+
+# Status texts Flashscore shows on a match page once the result is official
+FINAL_STATUSES = ("FINISHED", "AFTER OVERTIME", "AFTER OT", "AFTER PENALTIES", "AWARDED")
+
+
+def match_id_from_link(link: str) -> str:
+    for pattern in MATCH_ID_PATTERNS:
+        found = pattern.search(link)
+        if found:
+            return found.group(1)
+    return ""
+
+
+def is_final_status(status: str) -> bool:
+    return status.strip().upper().startswith(FINAL_STATUSES)
+
+
+class PageCache:
+    def __init__(self, directory = CACHE_DIR, max_bytes = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        # path -> size, oldest access first; filled from the directory on first use
+        self.entries = None
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def path(self, kind, link):
+        # The same match is reachable through several URLs, the match id is what identifies it
+        key = f"{kind}:{match_id_from_link(link) or link}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".json.gz")
+
+    def load_index(self):
+        if self.entries is not None:
+            return
+        files = []
+        if os.path.isdir(self.directory):
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    if not name.endswith(".json.gz"):
+                        continue
+                    path = os.path.join(root, name)
+                    with suppress(OSError):
+                        info = os.stat(path)
+                        files.append((info.st_mtime, path, info.st_size))
+        files.sort()
+        self.entries = OrderedDict((path, size) for _, path, size in files)
+        self.total_bytes = sum(self.entries.values())
+
+    def get(self, kind, link):
+        path = self.path(kind, link)
+        with self.lock:
+            self.load_index()
+            if path not in self.entries:
+                self.misses += 1
+                return None
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as file:
+                    payload = json.load(file)
+            except (OSError, ValueError):
+                # Deleted or half-written by another run, treat as a miss
+                self.total_bytes -= self.entries.pop(path)
+                self.misses += 1
+                return None
+            # The modification time doubles as the last access time across runs
+            with suppress(OSError):
+                os.utime(path)
+            self.entries.move_to_end(path)
+            self.hits += 1
+            return payload
+
+    def put(self, kind, link, payload):
+        path = self.path(kind, link)
+        data = gzip.compress(json.dumps(payload).encode('utf-8'))
+        with self.lock:
+            self.load_index()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_file = f"{path}.{os.getpid()}.tmp"
+                with open(temp_file, 'wb') as file:
+                    file.write(data)
+                os.replace(temp_file, path)
+            except OSError as e:
+                print(f"Error writing page cache entry: {e}")
+                return
+            self.total_bytes += len(data) - self.entries.pop(path, 0)
+            self.entries[path] = len(data)
+            self.evict()
+
+    def evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            path, size = self.entries.popitem(last=False)
+            with suppress(OSError):
+                os.remove(path)
+            self.total_bytes -= size
+            self.evicted += 1
+
+    def report(self) -> str:
+        with self.lock:
+            lookups = self.hits + self.misses
+            hit_rate = 100 * self.hits / lookups if lookups else 0
+            size = self.total_bytes / 1048576 if self.entries is not None else 0
+            return (f"Page cache: {self.hits}/{lookups} hits ({hit_rate:.0f}%), {self.evicted} evicted, "
+                    f"{size:.1f} MB on disk")
+
+
+page_cache = PageCache()
@@ -0,0 +1,93 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from threading import Lock
+import time
+from rate_governor import governor
+
+
+class WaitStats:
+    """
+    Records how long every named readiness wait actually took, so the run summary
+    shows which page conditions are slow instead of hiding it behind fixed sleeps.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.records = {}
+
+    def record(self, name, elapsed, timed_out):
+        with self.lock:
+            count, total, longest, timeouts = self.records.get(name, (0, 0.0, 0.0, 0))
+            self.records[name] = (count + 1, total + elapsed, max(longest, elapsed), timeouts + int(timed_out))
+
+    def report(self) -> str:
+        with self.lock:
+            records = dict(self.records)
+        lines = ["Readiness waits:"]
+        for name, (count, total, longest, timeouts) in sorted(records.items()):
+            lines.append(f"  {name}: {count} waits, {total / count:.2f}s avg, {longest:.2f}s max, {timeouts} timeouts")
+        return '\n'.join(lines)
+
+
+wait_stats = WaitStats()
+
+
+def wait_for(driver, name, condition, timeout = 10, poll = 0.1):
+    '''
+    Polls condition(driver) until it returns something truthy and returns that value.
+    `driver` can also be a WebElement to scope the condition to one section of the page.
+    Returns None if the condition still doesn't hold after `timeout` seconds.
+    '''
+    start = time.perf_counter()
+    timed_out = False
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=poll,
+                               ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)).until(condition)
+    except TimeoutException:
+        result = None
+        timed_out = True
+    wait_stats.record(name, time.perf_counter() - start, timed_out)
+    return result
+
+
+def load_page(driver, url = None):
+    '''
+    driver.get(url), or a reload of the current page without a url, holding one of the rate
+    governor's slots for the host while the browser loads it.
+    '''
+    with governor.request(url or driver.current_url):
+        if url is None:
+            driver.refresh()
+        else:
+            driver.get(url)
+
+
+def rows_added(row_count, class_name = "h2h__row"):
+    # Holds once a "show more" click has appended rows to the section
+    def condition(element):
+        rows = element.find_elements(By.CLASS_NAME, class_name)
+        return rows if len(rows) > row_count else False
+    return condition
+
+
+def quarter_cells_ready(driver):
+    '''
+    Holds once the match summary has 12 smh__part cells and every cell except the
+    two overtime ones (5 and 11) has text. Returns the cell texts.
+    '''
+    cells = driver.execute_script(
+        "return Array.from(document.getElementsByClassName('smh__part')).map(e => e.innerText.trim());"
+    )
+    if not cells or len(cells) < 12:
+        return False
+    if any(len(text) == 0 for index, text in enumerate(cells) if index not in (5, 11)):
+        return False
+    return cells
+
+
+def h2h_tab_link(driver):
+    # Holds once the match detail tabs are rendered, returns the H2H tab
+    for tab_button in driver.find_elements(By.CSS_SELECTOR, "div.detailOver > div > a"):
+        if tab_button.text.startswith("H2H"):
+            return tab_button
+    return False
@@ -0,0 +1,76 @@
+'''
+Local SQLite store of basketball quarter scores, shared by every run on this machine. A finished
+match's quarter scores never change, so once a match id is in here its page is never opened again.
+Cells are kept in the 12-cell smh__part layout get_quaters_data returns.
+'''
+import json
+import os
+import time
+
+from page_cache import match_id_from_link
+from sqlite_store import SqliteStore
+
+STORE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quarter_scores.db")
+
+# SQLite's default limit on host parameters in one statement is 999
+QUERY_CHUNK = 500
+
+
+class QuarterStore(SqliteStore):
+    SCHEMA = ("CREATE TABLE IF NOT EXISTS quarter_scores ("
+              "match_id TEXT PRIMARY KEY, cells TEXT NOT NULL, fetched_at REAL NOT NULL, source TEXT NOT NULL)")
+
+    def __init__(self, path = STORE_FILE):
+        super().__init__(path)
+        self.hits = 0
+        self.misses = 0
+        self.written = 0
+
+    def get_many(self, links):
+        '''Returns {link: quarter cells} for the links whose match is stored'''
+        ids = {}
+        for link in links:
+            match_id = match_id_from_link(link)
+            if match_id:
+                ids.setdefault(match_id, []).append(link)
+
+        found = {}
+        match_ids = list(ids)
+        with self.lock:
+            connection = self.connect()
+            for start in range(0, len(match_ids), QUERY_CHUNK):
+                chunk = match_ids[start:start + QUERY_CHUNK]
+                rows = connection.execute(
+                    f"SELECT match_id, cells FROM quarter_scores WHERE match_id IN ({','.join('?' * len(chunk))})", chunk
+                )
+                for match_id, cells in rows:
+                    for link in ids[match_id]:
+                        found[link] = json.loads(cells)
+            self.hits += len(found)
+            self.misses += len(links) - len(found)
+        return found
+
+    def put_many(self, quarter_scores, source):
+        '''Writes {link: quarter cells} in a single transaction, returns the number of rows written'''
+        fetched_at = time.time()
+        rows = [(match_id_from_link(link), json.dumps(cells), fetched_at, source)
+                for link, cells in quarter_scores.items() if match_id_from_link(link)]
+        if not rows:
+            return 0
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO quarter_scores (match_id, cells, fetched_at, source) VALUES (?, ?, ?, ?)", rows
+                )
+            self.written += len(rows)
+        return len(rows)
+
+    def report(self) -> str:
+        with self.lock:
+            lookups = self.hits + self.misses
+            hit_rate = 100 * self.hits / lookups if lookups else 0
+            return f"Quarter store: {self.hits}/{lookups} hits ({hit_rate:.0f}%), {self.written} written"
+
+
+quarter_store = QuarterStore()
@@ -0,0 +1,214 @@
+'''
+Shared rate and concurrency governor for every request the scrapers send out. Each host gets its
+own AIMD controller: while requests come back clean, the number allowed in flight grows by about
+one per window of successes and the request rate by RATE_STEP; a transport-level failure (a load
+that times out, a 429/503 answer, a dropped connection) halves both. Nothing is tuned per scraper,
+the limits settle where the site keeps up.
+
+Every page load or HTTP request goes through `with governor.request(url) as ticket:`, and only the
+load itself: waiting for a page to render or a "show more" click that finds nothing says nothing
+about the host, and neither does the time a whole scrape takes, which varies with the fixture.
+Exceptions leaving the block are classified, anything that isn't congestion counts as a plain error.
+'''
+import time
+from contextlib import contextmanager
+from threading import Condition, Lock, local
+from urllib.parse import urlparse
+
+# Answers that mean the site wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+# Exception class names of dropped or refused connections, looked up along the MRO
+NETWORK_NAMES = {"ConnectionError", "ProtocolError", "ChunkedEncodingError"}
+# Starting point and bounds of every host, in requests in flight and request starts per second.
+# Up to the limit's worth of requests may start back to back before the rate paces them.
+START_LIMIT = 2
+MAX_LIMIT = 16
+START_RATE = 1.0
+MIN_RATE = 0.05
+MAX_RATE = 5.0
+# Added to the rate after every healthy request
+RATE_STEP = 0.05
+# Weight of the newest latency in the smoothed one
+LATENCY_WEIGHT = 0.2
+
+# Outcomes from best to worst, a ticket keeps the worst one reported
+OUTCOMES = ("ok", "error", "network", "timeout", "throttled")
+CONGESTED = ("network", "timeout", "throttled")
+
+
+def classify_exception(e) -> str:
+    # By name and attributes, so neither selenium nor requests has to be imported here
+    response = getattr(e, 'response', None)
+    if response is not None and getattr(response, 'status_code', None) in THROTTLE_STATUSES:
+        return "throttled"
+    name = type(e).__name__
+    if name == "RetryError":
+        # requests gave up after the adapter retried 429/5xx answers
+        return "throttled"
+    if "Timeout" in name or isinstance(e, TimeoutError):
+        return "timeout"
+    if isinstance(e, ConnectionError) or {cls.__name__ for cls in type(e).__mro__} & NETWORK_NAMES:
+        return "network"
+    return "error"
+
+
+class Ticket:
+    def __init__(self, host):
+        self.host = host
+        self.start = time.perf_counter()
+        self.outcome = "ok"
+
+    def mark(self, outcome):
+        if OUTCOMES.index(outcome) > OUTCOMES.index(self.outcome):
+            self.outcome = outcome
+
+    def check_status(self, status_code):
+        if status_code in THROTTLE_STATUSES:
+            self.mark("throttled")
+
+
+class HostController:
+    def __init__(self, host, max_limit = MAX_LIMIT):
+        self.host = host
+        self.condition = Condition()
+        self.limit = float(START_LIMIT)
+        self.max_limit = max_limit
+        self.rate = START_RATE
+        self.in_flight = 0
+        self.next_start = 0.0
+        self.latency = None
+        self.last_decrease = 0.0
+
+        self.started_at = None
+        self.counts = {outcome: 0 for outcome in OUTCOMES}
+        self.peak_in_flight = 0
+
+    def acquire(self) -> bool:
+        '''Waits for a slot, returns whether the wait was for the request rate'''
+        paced = False
+        with self.condition:
+            while True:
+                now = time.perf_counter()
+                # Starts are paced at the rate, with a burst of up to limit starts allowed
+                start_at = self.next_start - (int(self.limit) - 1) / self.rate
+                if self.in_flight < int(self.limit) and now >= start_at:
+                    break
+                wait = start_at - now if self.in_flight < int(self.limit) else None
+                paced = paced or wait is not None
+                self.condition.wait(wait)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.next_start = max(now, self.next_start) + 1.0 / self.rate
+            if self.started_at is None:
+                self.started_at = now
+        return paced
+
+    def release(self, latency, outcome, paced = False):
+        with self.condition:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            if outcome == "ok":
+                self.latency = latency if self.latency is None else \
+                    (1 - LATENCY_WEIGHT) * self.latency + LATENCY_WEIGHT * latency
+            self.counts[outcome] += 1
+
+            if outcome == "ok":
+                # Additive increase, about one more request in flight per limit's worth of successes;
+                # only a limit that is actually holding callers back is raised
+                if saturated:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                if paced:
+                    self.rate = min(MAX_RATE, self.rate + RATE_STEP)
+            elif outcome in CONGESTED:
+                # Multiplicative decrease, at most once per smoothed latency so that the requests
+                # already in flight when the site choked don't each halve the limits again
+                now = time.perf_counter()
+                if now - self.last_decrease > (self.latency or latency):
+                    self.limit = max(1.0, self.limit / 2)
+                    self.rate = max(MIN_RATE, self.rate / 2)
+                    self.next_start = now + 1.0 / self.rate
+                    self.last_decrease = now
+            self.condition.notify_all()
+
+    def throughput(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.started_at
+        done = sum(self.counts.values())
+        return done / elapsed if elapsed > 0 else 0.0
+
+
+class RateGovernor:
+    def __init__(self, max_limit = MAX_LIMIT):
+        self.lock = Lock()
+        self.max_limit = max_limit
+        self.hosts = {}
+        self.thread_data = local()
+
+    def controller(self, url_or_host) -> HostController:
+        host = urlparse(url_or_host).netloc or url_or_host
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostController(host, self.max_limit)
+            return self.hosts[host]
+
+    @contextmanager
+    def request(self, url_or_host):
+        '''Holds one of the host's slots for the duration of the block'''
+        controller = self.controller(url_or_host)
+        outer = getattr(self.thread_data, 'ticket', None)
+        if outer is not None and outer.host == controller.host:
+            # This thread already holds one of the host's slots (a retried load inside a governed
+            # scrape), the inner request is part of it
+            try:
+                yield outer
+            except Exception as e:
+                outer.mark(classify_exception(e))
+                raise
+            return
+
+        paced = controller.acquire()
+        ticket = Ticket(controller.host)
+        self.thread_data.ticket = ticket
+        try:
+            yield ticket
+        except Exception as e:
+            ticket.mark(classify_exception(e))
+            raise
+        finally:
+            self.thread_data.ticket = outer
+            controller.release(time.perf_counter() - ticket.start, ticket.outcome, paced)
+
+    def mark(self, outcome):
+        '''Reports an outcome for the request this thread is making, if it is making one'''
+        ticket = getattr(self.thread_data, 'ticket', None)
+        if ticket is not None:
+            ticket.mark(outcome)
+
+    def limits(self):
+        '''{host: (requests allowed in flight, request starts per second, completed requests per second)}'''
+        with self.lock:
+            controllers = list(self.hosts.values())
+        limits = {}
+        for controller in controllers:
+            with controller.condition:
+                limits[controller.host] = (int(controller.limit), controller.rate, controller.throughput())
+        return limits
+
+    def report(self) -> str:
+        with self.lock:
+            controllers = list(self.hosts.values())
+        if not controllers:
+            return "Rate governor: no requests"
+        lines = ["Rate governor:"]
+        for controller in controllers:
+            with controller.condition:
+                counts = ', '.join(f"{count} {outcome}" for outcome, count in controller.counts.items() if count)
+                latency = f"{controller.latency:.2f}s" if controller.latency is not None else "n/a"
+                lines.append(f"  {controller.host}: limit {int(controller.limit)} (peak {controller.peak_in_flight} in flight), "
+                             f"{controller.rate:.2f} req/s allowed, {controller.throughput():.2f} req/s done, "
+                             f"latency {latency}; {counts}")
+        return '\n'.join(lines)
+
+
+governor = RateGovernor()
@@ -0,0 +1,184 @@
+'''
+One retry policy for page loads, element waits and HTTP requests. An operation is retried with
+jittered exponential backoff while its failure is of a retryable kind and its deadline allows
+another attempt; the loads inside an attempt take their own rate governor slots. A per-host circuit breaker
+opens after a run of outage-like failures (timeouts, throttling, dropped connections), so every
+caller stops hammering the site at once and probes it again after a cooldown.
+
+Failure kinds: "timeout", "throttled", "network", "server" (other 5xx answers), "http" (4xx), "missing"
+(the page loaded without the element or data expected), "browser" (the driver itself failed),
+"circuit_open" and "error" for everything else. failure_stats counts them per operation.
+'''
+import random
+import time
+from threading import Lock
+from urllib.parse import urlparse
+
+from rate_governor import classify_exception
+
+# Exception class names looked up along the MRO, so selenium and requests needn't be imported here
+MISSING_NAMES = {"NoSuchElementException", "StaleElementReferenceException", "ElementNotInteractableException"}
+BROWSER_NAMES = {"WebDriverException"}
+
+RETRYABLE = ("timeout", "throttled", "network", "server", "missing")
+# Failures that say the site is struggling rather than that one page is odd
+OUTAGE = ("timeout", "throttled", "network", "server")
+
+# Consecutive outage failures that open a host's circuit, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+MAX_BREAKER_COOLDOWN = 300.0
+
+
+class IncompletePage(Exception):
+    '''The page loaded but what the scraper waits for never showed up'''
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+def classify_failure(e) -> str:
+    if isinstance(e, CircuitOpen):
+        return "circuit_open"
+    # timeout, throttled and network come from the rate governor's classification
+    kind = classify_exception(e)
+    if kind != "error":
+        return kind
+    names = {cls.__name__ for cls in type(e).__mro__}
+    if isinstance(e, (IncompletePage, IndexError, KeyError)) or names & MISSING_NAMES:
+        return "missing"
+    if names & BROWSER_NAMES:
+        return "browser"
+    status_code = getattr(getattr(e, 'response', None), 'status_code', None)
+    if status_code is not None:
+        return "server" if status_code >= 500 else "http"
+    return "error"
+
+
+class RetryPolicy:
+    def __init__(self, attempts = 3, base_delay = 1.0, max_delay = 30.0, deadline = 60.0, retry_on = RETRYABLE):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_on = retry_on
+
+    def backoff(self, attempt) -> float:
+        # Full jitter, callers failing together don't come back together
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+class CircuitBreaker:
+    def __init__(self, host):
+        self.host = host
+        self.failures = 0
+        self.cooldown = BREAKER_COOLDOWN
+        self.open_until = 0.0
+        self.trips = 0
+
+    def record(self, kind):
+        if kind is None:
+            self.failures = 0
+            self.cooldown = BREAKER_COOLDOWN
+            self.open_until = 0.0
+        elif kind in OUTAGE:
+            self.failures += 1
+            if self.failures >= BREAKER_THRESHOLD:
+                # A failed probe after a cooldown opens the circuit for twice as long
+                if self.open_until:
+                    self.cooldown = min(MAX_BREAKER_COOLDOWN, self.cooldown * 2)
+                self.open_until = time.monotonic() + self.cooldown
+                self.failures = BREAKER_THRESHOLD - 1
+                self.trips += 1
+                print(f"Circuit for {self.host} open for {self.cooldown:.0f}s after repeated {kind} failures")
+
+
+class FailureStats:
+    """
+    Failed attempts per operation and kind, plus how many calls came through after retrying and
+    how many gave up, for the run summary.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.records = {}
+
+    def record(self, name, kind = None, recovered = False, gave_up = False):
+        with self.lock:
+            attempts, recoveries, failures = self.records.get(name, ({}, 0, 0))
+            if kind is not None:
+                attempts = dict(attempts)
+                attempts[kind] = attempts.get(kind, 0) + 1
+            self.records[name] = (attempts, recoveries + int(recovered), failures + int(gave_up))
+
+    def report(self) -> str:
+        with self.lock:
+            records = dict(self.records)
+        if not records:
+            return "Failures: none"
+        lines = ["Failures:"]
+        for name, (attempts, recoveries, failures) in sorted(records.items()):
+            kinds = ', '.join(f"{count} {kind}" for kind, count in sorted(attempts.items()))
+            lines.append(f"  {name}: {kinds}; {recoveries} recovered by retrying, {failures} gave up")
+        return '\n'.join(lines)
+
+
+failure_stats = FailureStats()
+breakers = {}
+breakers_lock = Lock()
+
+
+def get_breaker(url_or_host) -> CircuitBreaker:
+    host = urlparse(url_or_host).netloc or url_or_host
+    with breakers_lock:
+        if host not in breakers:
+            breakers[host] = CircuitBreaker(host)
+        return breakers[host]
+
+
+def wait_for_circuit(breaker, deadline):
+    with breakers_lock:
+        remaining = breaker.open_until - time.monotonic()
+    if remaining <= 0:
+        return
+    if time.monotonic() + remaining > deadline:
+        raise CircuitOpen(f"circuit for {breaker.host} is open for another {remaining:.0f}s")
+    time.sleep(remaining)
+
+
+def retry_call(name, url, operation, policy = DEFAULT_POLICY, recover = None):
+    '''
+    Runs operation() under policy and returns its result, re-raising the last failure once no
+    further attempt is allowed. recover(), if given, runs before every retry (e.g. driver.refresh).
+    '''
+    breaker = get_breaker(url)
+    deadline = time.monotonic() + policy.deadline
+    for attempt in range(policy.attempts):
+        try:
+            wait_for_circuit(breaker, deadline)
+            result = operation()
+        except Exception as e:
+            kind = classify_failure(e)
+            failure_stats.record(name, kind)
+            with breakers_lock:
+                breaker.record(kind)
+            delay = policy.backoff(attempt)
+            if kind not in policy.retry_on or attempt + 1 >= policy.attempts or time.monotonic() + delay > deadline:
+                failure_stats.record(name, gave_up=True)
+                raise
+            print(f"{name}: {kind} on {url} ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            if recover is not None:
+                try:
+                    recover()
+                except Exception as recover_error:
+                    print(f"{name}: recovery failed: {recover_error}")
+        else:
+            with breakers_lock:
+                breaker.record(None)
+            if attempt:
+                failure_stats.record(name, recovered=True)
+            return result
@@ -0,0 +1,65 @@
+'''
+Progress manifest for the fixture scrapers, keyed by fixture link. A fixture is "writing" while its
+block is being appended to the output file and "done" once the append is flushed; a restarted run
+skips done fixtures whatever their position in today's listing, and cuts a half-written block off
+the output file before the fixture is done again.
+'''
+import json
+import os
+import time
+from contextlib import suppress
+from threading import Lock
+
+# Entries older than this are dropped, fixture links are never reused
+KEEP_DAYS = 7
+
+
+class RunManifest:
+    def __init__(self, path, keep_days = KEEP_DAYS):
+        self.path = path
+        self.lock = Lock()
+        self.entries = {}
+        with suppress(FileNotFoundError, ValueError):
+            with open(path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+
+        cutoff = time.time() - keep_days * 86400
+        self.entries = {link: entry for link, entry in self.entries.items() if entry['updated'] > cutoff}
+        self.repair()
+
+    def save(self):
+        temp_file = self.path + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, indent=2)
+        os.replace(temp_file, self.path)
+
+    def repair(self):
+        # Blocks are appended one at a time, so an unfinished one is always the last thing in its file
+        for link, entry in list(self.entries.items()):
+            if entry['state'] != "writing":
+                continue
+            with suppress(FileNotFoundError):
+                if os.path.getsize(entry['output']) > entry['offset']:
+                    with open(entry['output'], 'r+b') as file:
+                        file.truncate(entry['offset'])
+                    print(f"Removed the half-written block of {link} from {entry['output']}")
+            del self.entries[link]
+        self.save()
+
+    def is_done(self, link) -> bool:
+        with self.lock:
+            entry = self.entries.get(link)
+            return entry is not None and entry['state'] == "done"
+
+    def begin(self, link, output):
+        '''Call right before the fixture's block is appended to output'''
+        offset = os.path.getsize(output) if os.path.exists(output) else 0
+        with self.lock:
+            self.entries[link] = {'state': "writing", 'output': output, 'offset': offset, 'updated': time.time()}
+            self.save()
+
+    def finish(self, link):
+        with self.lock:
+            self.entries[link]['state'] = "done"
+            self.entries[link]['updated'] = time.time()
+            self.save()
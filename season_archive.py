@@ -0,0 +1,160 @@
+'''
+Append-only archive of the basketball season tables, partitioned as
+<root>/league=<league>/season=<season>/. Every scraper run adds one segment holding only its new
+rows, and a small manifest lists the live segments, so an incremental update never reads or
+rewrites the rows already stored. Segments are Parquet when pyarrow is installed and gzip CSV
+otherwise; compact() folds them back into one once they pile up.
+
+Values are stored exactly as scraped (strings), so export_csv() reproduces the CSV the C++
+load_data reads byte for byte. read_columns() loads only the columns asked for.
+'''
+import csv
+import gzip
+import json
+import os
+from typing import List
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+MANIFEST = "_manifest.json"
+# Segments allowed to pile up before compact() merges them
+MAX_SEGMENTS = 16
+# Text columns, every other column is numeric
+TEXT_COLUMNS = ("DATE", "HOME", "AWAY")
+
+
+class SeasonArchive:
+    def __init__(self, root: str, league: str, season: str, field_names: List[str]):
+        self.folder = os.path.join(root, f"league={league}", f"season={season}")
+        self.field_names = list(field_names)
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self):
+        try:
+            with open(os.path.join(self.folder, MANIFEST), 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return {"field_names": self.field_names, "segments": [], "next": 0}
+        if manifest["field_names"] != self.field_names:
+            raise ValueError(f"Archive {self.folder} has a different schema, export it and start a new one")
+        return manifest
+
+    def save_manifest(self):
+        # The manifest swap is the commit point, a segment not listed in it doesn't exist
+        temp_file = os.path.join(self.folder, MANIFEST + ".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            json.dump(self.manifest, file, indent=2)
+        os.replace(temp_file, os.path.join(self.folder, MANIFEST))
+
+    def count(self) -> int:
+        return sum(segment["rows"] for segment in self.manifest["segments"])
+
+    def write_segment(self, rows: List[List[str]]) -> str:
+        os.makedirs(self.folder, exist_ok=True)
+        name = f"segment-{self.manifest['next']:06d}" + (".parquet" if pq else ".csv.gz")
+        self.manifest["next"] += 1
+        path = os.path.join(self.folder, name)
+        temp_file = path + ".tmp"
+        if pq:
+            columns = list(zip(*rows)) if rows else [[] for _ in self.field_names]
+            table = pa.table({field: pa.array(column, pa.string()) for field, column in zip(self.field_names, columns)})
+            pq.write_table(table, temp_file, compression='zstd')
+        else:
+            with gzip.open(temp_file, 'wt', newline='', encoding='utf-8') as file:
+                writer = csv.writer(file)
+                writer.writerow(self.field_names)
+                writer.writerows(rows)
+        os.replace(temp_file, path)
+        return name
+
+    def read_segment(self, name: str, columns: List[str] = None) -> List[List[str]]:
+        path = os.path.join(self.folder, name)
+        columns = columns or self.field_names
+        if name.endswith(".parquet"):
+            table = pq.read_table(path, columns=columns)
+            return [list(row) for row in zip(*(table.column(column).to_pylist() for column in columns))]
+        with gzip.open(path, 'rt', newline='', encoding='utf-8') as file:
+            reader = csv.reader(file)
+            header = next(reader)
+            indexes = [header.index(column) for column in columns]
+            return [[row[index] for index in indexes] for row in reader]
+
+    def append(self, rows: List[List[str]], last_match_id: str = None):
+        '''
+        Stores rows (newest first, in field_names order) as a new segment. last_match_id records the
+        newest match the rows cover, committed in the same manifest swap.
+        '''
+        if rows:
+            name = self.write_segment(rows)
+            self.manifest["segments"].append({"file": name, "rows": len(rows)})
+        elif last_match_id is None:
+            return
+        if last_match_id is not None:
+            self.manifest["last_match_id"] = last_match_id
+        os.makedirs(self.folder, exist_ok=True)
+        self.save_manifest()
+
+    def import_csv(self, csv_file: str):
+        '''One-time migration of an existing season CSV into an empty archive'''
+        with open(csv_file, 'r', newline='', encoding='utf-8') as file:
+            rows = [[row[column] for column in self.field_names] for row in csv.DictReader(file)]
+        self.append(rows)
+        print(f"Imported {len(rows)} rows from {csv_file} into the archive.")
+
+    def read_rows(self, columns: List[str] = None) -> List[List[str]]:
+        # Later segments hold newer matches, the season reads newest first like the CSV
+        rows = []
+        for segment in reversed(self.manifest["segments"]):
+            rows.extend(self.read_segment(segment["file"], columns))
+        return rows
+
+    def read_columns(self, columns: List[str] = None) -> pd.DataFrame:
+        '''Only the requested columns are read, numeric columns come back as floats'''
+        columns = columns or self.field_names
+        frame = pd.DataFrame(self.read_rows(columns), columns=columns)
+        for column in columns:
+            if column not in TEXT_COLUMNS:
+                frame[column] = pd.to_numeric(frame[column], errors='coerce')
+        return frame
+
+    def compact(self, max_segments: int = MAX_SEGMENTS, force: bool = False):
+        segments = self.manifest["segments"]
+        if len(segments) < 2 or (len(segments) <= max_segments and not force):
+            return
+        # Each newer segment goes in front, so the merged one reads newest first like read_rows()
+        rows = []
+        for segment in segments:
+            rows[:0] = self.read_segment(segment["file"])
+        name = self.write_segment(rows)
+        self.manifest["segments"] = [{"file": name, "rows": len(rows)}]
+        self.save_manifest()
+
+        live_files = {name, MANIFEST}
+        for file_name in os.listdir(self.folder):
+            if file_name.startswith("segment-") and file_name not in live_files:
+                os.remove(os.path.join(self.folder, file_name))
+        print(f"Compacted {len(segments)} segments into {name}")
+
+    def needs_export(self, csv_file: str) -> bool:
+        # Segments written since the last export, possibly by a run that crashed before exporting
+        return not os.path.exists(csv_file) or self.manifest.get("exported") != self.manifest["next"]
+
+    def export_csv(self, csv_file: str):
+        '''Writes the whole season as the CSV load_data expects, replacing csv_file atomically'''
+        temp_file = csv_file + ".tmp"
+        with open(temp_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.field_names)
+            for segment in reversed(self.manifest["segments"]):
+                writer.writerows(self.read_segment(segment["file"]))
+        os.replace(temp_file, csv_file)
+        if self.manifest["segments"]:
+            self.manifest["exported"] = self.manifest["next"]
+            self.save_manifest()
@@ -0,0 +1,90 @@
+'''
+Vectorized advanced metrics over whole season tables (the bbarchivescraper field_names schema).
+Every metric is computed for all games of a season in one pass of column arithmetic, so derived
+columns for every archived league and season can be recomputed without touching the network.
+
+The box scores have no minutes played, so pace is possessions per team per game, and possessions
+use the same estimate as build_season_row: FGA + 0.44 * FTA - OREB + TOV.
+'''
+import glob
+import os
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from season_archive import SeasonArchive
+
+# Box score columns the metrics are built from, per side
+BOX_SCORE = ("SCORE", "FGA", "FG", "3FG", "FTA", "FT", "OREB", "DREB", "TOV")
+INPUT_COLUMNS = ["DATE", "HOME", "AWAY"] + [f"{side}_{stat}" for stat in BOX_SCORE for side in ("H", "A")]
+
+
+def safe_ratio(numerator, denominator):
+    # Games with a missing box score give NaN instead of inf
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (numerator / denominator).replace([np.inf, -np.inf], np.nan)
+
+
+def add_metrics(frame: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Returns a copy of frame with, for both sides (H_/A_): POSS, OFF_RATING, DEF_RATING, NET_RATING,
+    EFG%, TS%, TOV%, OREB%, FT_RATE, plus PACE and TOTAL for the game.
+    '''
+    frame = frame.copy()
+    numeric = {column: pd.to_numeric(frame[column], errors='coerce') for column in INPUT_COLUMNS[3:]}
+
+    for side, other in (("H", "A"), ("A", "H")):
+        score, fga, fg, fg3 = (numeric[f"{side}_{stat}"] for stat in ("SCORE", "FGA", "FG", "3FG"))
+        fta, ft, oreb, tov = (numeric[f"{side}_{stat}"] for stat in ("FTA", "FT", "OREB", "TOV"))
+        shots = fga + 0.44 * fta
+        possessions = shots - oreb + tov
+
+        frame[f"{side}_POSS"] = possessions
+        frame[f"{side}_OFF_RATING"] = safe_ratio(score, possessions) * 100
+        frame[f"{side}_DEF_RATING"] = safe_ratio(numeric[f"{other}_SCORE"], possessions) * 100
+        frame[f"{side}_NET_RATING"] = frame[f"{side}_OFF_RATING"] - frame[f"{side}_DEF_RATING"]
+        # Four factors: shooting, turnovers, offensive rebounding, free throws
+        frame[f"{side}_EFG%"] = safe_ratio(fg + 0.5 * fg3, fga)
+        frame[f"{side}_TOV%"] = safe_ratio(tov, shots + tov)
+        frame[f"{side}_OREB%"] = safe_ratio(oreb, oreb + numeric[f"{other}_DREB"])
+        frame[f"{side}_FT_RATE"] = safe_ratio(ft, fga)
+        frame[f"{side}_TS%"] = safe_ratio(score, 2 * shots)
+
+    frame["PACE"] = (frame["H_POSS"] + frame["A_POSS"]) / 2
+    frame["TOTAL"] = numeric["H_SCORE"] + numeric["A_SCORE"]
+    return frame
+
+
+def season_partitions(archive_root: str) -> List[Tuple[str, str]]:
+    partitions = []
+    for folder in sorted(glob.glob(os.path.join(archive_root, "league=*", "season=*"))):
+        league = os.path.basename(os.path.dirname(folder)).split("=", 1)[1]
+        season = os.path.basename(folder).split("=", 1)[1]
+        partitions.append((league, season))
+    return partitions
+
+
+def recompute_seasons(archive_root: str, field_names: List[str], leagues: List[str] = None,
+                      output_name: str = "metrics.csv") -> Dict[Tuple[str, str], pd.DataFrame]:
+    '''
+    Recomputes the metrics of every archived season (or only the given leagues) and writes each
+    season's table to output_name inside its partition. Only the box score columns are read.
+    '''
+    results = {}
+    start_time = time.perf_counter()
+    for league, season in season_partitions(archive_root):
+        if leagues and league not in leagues:
+            continue
+        archive = SeasonArchive(archive_root, league, season, field_names)
+        if archive.count() == 0:
+            continue
+        frame = add_metrics(archive.read_columns(INPUT_COLUMNS))
+        frame.to_csv(os.path.join(archive.folder, output_name), index=False)
+        results[(league, season)] = frame
+        print(f"{league} {season}: {len(frame)} games")
+
+    games = sum(len(frame) for frame in results.values())
+    print(f"Recomputed metrics for {len(results)} seasons, {games} games in {time.perf_counter() - start_time:.2f}s")
+    return results
@@ -0,0 +1,31 @@
+'''
+Base of the local SQLite stores (quarter scores, team history). Each store is one database file
+holding one table, opened on first use and shared by every worker thread of a run.
+'''
+import sqlite3
+from threading import Lock
+
+
+class SqliteStore:
+    # CREATE TABLE IF NOT EXISTS statement of the store's table
+    SCHEMA = None
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.connection = None
+
+    def connect(self):
+        # Opened on first use, worker threads share the one connection under the lock
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # WAL lets a run read while another run is writing
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(self.SCHEMA)
+        return self.connection
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
@@ -0,0 +1,82 @@
+'''
+Per-team index of past matches read off the H2H "last matches" sections, keyed by (team, league)
+and ordered newest first. With the index a section only has to be paged back to the newest match
+already stored; everything older comes from here instead of more "show more" clicks.
+'''
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from page_cache import match_id_from_link
+from sqlite_store import SqliteStore
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "team_history.db")
+
+# Matches older than this are never read by get_team_last_matches, so they aren't kept
+HISTORY_DAYS = 730
+
+
+def match_key(match):
+    return match_id_from_link(match['link']) or match['link']
+
+
+def merge_history(rows, history):
+    '''
+    Puts freshly read rows (newest first) in front of the stored history. Rows from the first
+    stored match onwards are already in the history and are dropped.
+    '''
+    known = {match_key(match) for match in history}
+    merged = []
+    for row in rows:
+        if match_key(row) in known:
+            break
+        merged.append(row)
+    new_keys = {match_key(row) for row in merged}
+    return merged + [match for match in history if match_key(match) not in new_keys]
+
+
+class TeamHistoryIndex(SqliteStore):
+    SCHEMA = ("CREATE TABLE IF NOT EXISTS team_history ("
+              "team TEXT NOT NULL, league TEXT NOT NULL, matches TEXT NOT NULL, updated_at REAL NOT NULL, "
+              "PRIMARY KEY (team, league))")
+
+    def __init__(self, path = HISTORY_FILE):
+        super().__init__(path)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, team, league):
+        with self.lock:
+            row = self.connect().execute(
+                "SELECT matches FROM team_history WHERE team = ? AND league = ?", (team, league)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return []
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, team, league, matches):
+        cutoff_date = datetime.now() - timedelta(days=HISTORY_DAYS)
+        kept = []
+        for match in matches:
+            try:
+                if datetime.strptime(match['date'], '%d.%m.%y') > cutoff_date:
+                    kept.append(match)
+            except ValueError:
+                continue
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO team_history (team, league, matches, updated_at) VALUES (?, ?, ?, ?)",
+                    (team, league, json.dumps(kept), time.time())
+                )
+
+    def report(self) -> str:
+        with self.lock:
+            return f"Team history: {self.hits}/{self.hits + self.misses} teams already indexed"
+
+
+team_history = TeamHistoryIndex()
@@ -1,21 +1,33 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime, timedelta
 import time
-from time import sleep
 from contextlib import suppress
 import re
 from threading import Thread
+from fixture_extractor import iter_league_fixtures, iter_listing_days
+from fixture_pipeline import FixturePipeline
+from rate_governor import governor, THROTTLE_STATUSES
+from page_waits import load_page
+from retry_policy import RetryPolicy, retry_call, failure_stats
+from run_manifest import RunManifest
+from browser_profile import apply_lean_profile, start_lean_session, page_weight
 
 
 #.....................................................................................................................
 #scrape male and female players based on Elo rankings
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from html.parser import HTMLParser
+from itertools import islice
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
 import csv
+import json
+import hashlib
 from datetime import datetime
 import os
 import unicodedata
@@ -47,100 +59,362 @@ def clean_text(text):
     
     return text.strip()
 
-def scrape_tennis_elo_rankings(urls):
-    # URL for Tennis Abstract ATP ELO ratings
-    
-    # Headers to mimic a browser request
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    for url in urls:
-        try:
-            # Send GET request to the URL
-            print(f"Fetching data from {url}...")
-            response = requests.get(url, headers=headers)
-            
-            # Explicitly set encoding to handle special characters properly
-            response.encoding = 'utf-8'
-            
-            # Check if the request was successful
-            if response.status_code == 200:
-                print(f"Successfully retrieved the page: Status code {response.status_code}")
-                soup = BeautifulSoup(response.text, 'html.parser')
-                table = soup.find_all('table')
-                if not table:
-                    print("Could not find the rankings table.")
-                    return None
-                table = table[2]
+ELO_DATA_DIR = r"C:\Users\HP\source\repos\Rehoboam\Rehoboam\Data\Tennis"
+# ETag, Last-Modified and content hash of the last page each CSV was written from
+ELO_STATE_FILE = os.path.join(ELO_DATA_DIR, "elo_fetch_state.json")
+elo_state_lock = Lock()
+
+
+def elo_csv_filename(url):
+    atp_file = f"men_elo_rankings.csv"
+    wta_file = f"women_elo_rankings.csv"
+    return os.path.join(ELO_DATA_DIR, atp_file) if 'atp' in url else os.path.join(ELO_DATA_DIR, wta_file)
+
+
+def load_elo_state():
+    with suppress(Exception):
+        with open(ELO_STATE_FILE, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    return {}
+
+
+def save_elo_state(state):
+    os.makedirs(ELO_DATA_DIR, exist_ok=True)
+    temp_file = ELO_STATE_FILE + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as file:
+        json.dump(state, file, indent=2)
+    os.replace(temp_file, ELO_STATE_FILE)
+
+
+# The ratings are the third table on the page
+ELO_TABLE_INDEX = 2
+# Table start tags, with scripts, styles and comments matched whole so a table mentioned inside one
+# isn't counted, the same tables BeautifulSoup finds
+TABLE_START = re.compile(r'<!--.*?-->|<script\b.*?</script\s*>|<style\b.*?</style\s*>|(<table\b)', re.IGNORECASE | re.DOTALL)
+PARSE_CHUNK = 64 * 1024
 
+
+class EloTableParser(HTMLParser):
+    """
+    Streaming parser for the first table in the text it is fed. Every row is handed to
+    on_row([(tag, text), ...]) as soon as it closes, and parsing stops at the table's end tag.
+    """
+    def __init__(self, on_row):
+        super().__init__()
+        self.on_row = on_row
+        self.depth = 0
+        self.row = None
+        self.cell = None
+        self.cell_tag = None
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == 'table':
+            self.depth += 1
+        elif self.depth == 1 and tag == 'tr':
+            self.end_row()
+            self.row = []
+        elif self.depth == 1 and tag in ('td', 'th') and self.row is not None:
+            self.end_cell()
+            self.cell = []
+            self.cell_tag = tag
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if tag == 'table':
+            self.depth -= 1
+            if self.depth == 0:
+                self.end_row()
+                self.done = True
+        elif self.depth == 1 and tag in ('td', 'th'):
+            self.end_cell()
+        elif self.depth == 1 and tag == 'tr':
+            self.end_row()
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+
+    def end_cell(self):
+        if self.cell is not None:
+            self.row.append((self.cell_tag, ''.join(self.cell)))
+            self.cell = None
+
+    def end_row(self):
+        self.end_cell()
+        if self.row is not None:
+            row, self.row = self.row, None
+            self.on_row(row)
+
+
+def stream_elo_table(html, csv_filename):
+    '''
+    Parses the ratings table and writes each player row to csv_filename as soon as it is read.
+    The CSV is written to a temp file and only replaces the old one once the table parsed.
+    Returns the number of player rows written, or None if the table isn't there.
+    '''
+    start_time = time.perf_counter()
+    # Jump straight to the ratings table instead of parsing everything before it
+    tables = (found.start(1) for found in TABLE_START.finditer(html) if found.group(1))
+    starts = list(islice(tables, ELO_TABLE_INDEX + 1))
+    if len(starts) <= ELO_TABLE_INDEX:
+        print("Could not find the rankings table.")
+        return None
+
+    os.makedirs(os.path.dirname(csv_filename), exist_ok=True)
+    temp_file = csv_filename + ".tmp"
+    headers_list = []
+    row_number = 0
+    written = 0
+    with open(temp_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = None
+
+        def on_row(row):
+            nonlocal headers_list, row_number, written, writer
+            row_number += 1
+            if row_number == 1:
                 # Extract table headers
-                headers_list = []
-                header_row = table.find('tr')
-                if header_row:
-                    headers_list = [clean_text(th.text) for th in header_row.find_all('th')]
-                    headers_list = [string for string in headers_list if len(string) > 0]
-                
-                if not headers_list:
-                    print("Could not find table headers.")
-                    return None
-                
-                player_rows = table.find_all('tr')[1:]
-                
-                if not player_rows:
-                    print("Could not find player rows.")
-                    return None
-                
-                print(f"Found {len(player_rows)} player rows")
-                
-                # Prepare data structure
-                rankings_data = []
-                
-                for num, row in enumerate(player_rows):
-                    try:
-                        # Extract all cells in the row and clean the text
-                        cells = [clean_text(x.text) for x in row.find_all(['td', 'th'])]
-                        cells = [string for string in cells if len(string) > 0]
-                        
-                        if len(cells) >= len(headers_list):
-                            player_data = {}
-                            for i, header in enumerate(headers_list):
-                                player_data[header] = cells[i]
-                            
-                            rankings_data.append(player_data)
-                        else:
-                            print(f"Row {num+1} has fewer cells ({len(cells)}) than headers ({len(headers_list)})")
-                    except Exception as e:
-                        print(f"Error extracting data from row: {e}")
-                        continue
-                
-                
-                # Save data to CSV
-                base = r"C:\Users\HP\source\repos\Rehoboam\Rehoboam\Data\Tennis"
-                atp_file = f"men_elo_rankings.csv"
-                wta_file = f"women_elo_rankings.csv"
-                csv_filename = os.path.join(base, atp_file) if 'atp' in url else os.path.join(base, wta_file)
-                
-                # Create directory if it doesn't exist
-                os.makedirs(os.path.dirname(csv_filename), exist_ok=True)
-                
-                with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
+                headers_list = [clean_text(text) for tag, text in row if tag == 'th']
+                headers_list = [string for string in headers_list if len(string) > 0]
+                if headers_list:
                     writer = csv.DictWriter(csvfile, fieldnames=headers_list)
                     writer.writeheader()
-                    for player_data in rankings_data:
-                        writer.writerow(player_data)
-                
-                print(f"Data saved to {csv_filename}")
+                return
+            if writer is None:
+                return
+            try:
+                # Extract all cells in the row and clean the text
+                cells = [clean_text(text) for _, text in row]
+                cells = [string for string in cells if len(string) > 0]
+
+                if len(cells) >= len(headers_list):
+                    player_data = {}
+                    for i, header in enumerate(headers_list):
+                        player_data[header] = cells[i]
+                    writer.writerow(player_data)
+                    written += 1
+                else:
+                    print(f"Row {row_number - 1} has fewer cells ({len(cells)}) than headers ({len(headers_list)})")
+            except Exception as e:
+                print(f"Error extracting data from row: {e}")
+
+        parser = EloTableParser(on_row)
+        for offset in range(starts[-1], len(html), PARSE_CHUNK):
+            parser.feed(html[offset:offset + PARSE_CHUNK])
+            if parser.done:
+                break
+        if not parser.done:
+            parser.close()
+            parser.end_row()
+
+    if not headers_list or row_number < 2:
+        print("Could not find table headers." if not headers_list else "Could not find player rows.")
+        os.remove(temp_file)
+        return None
+
+    os.replace(temp_file, csv_filename)
+    print(f"Parsed {written} of {row_number - 1} player rows in {(time.perf_counter() - start_time) * 1000:.0f} ms")
+    return written
+
+
+def parse_elo_table_soup(html):
+    '''
+    The previous BeautifulSoup parser, kept as the reference for benchmark_elo_parsers().
+    Returns (headers_list, rankings_data) from the ratings table, or None if it isn't there.
+    '''
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find_all('table')
+    if not table:
+        print("Could not find the rankings table.")
+        return None
+    table = table[2]
+
+    # Extract table headers
+    headers_list = []
+    header_row = table.find('tr')
+    if header_row:
+        headers_list = [clean_text(th.text) for th in header_row.find_all('th')]
+        headers_list = [string for string in headers_list if len(string) > 0]
+    
+    if not headers_list:
+        print("Could not find table headers.")
+        return None
+    
+    player_rows = table.find_all('tr')[1:]
+    
+    if not player_rows:
+        print("Could not find player rows.")
+        return None
+    
+    print(f"Found {len(player_rows)} player rows")
+    
+    # Prepare data structure
+    rankings_data = []
+    
+    for num, row in enumerate(player_rows):
+        try:
+            # Extract all cells in the row and clean the text
+            cells = [clean_text(x.text) for x in row.find_all(['td', 'th'])]
+            cells = [string for string in cells if len(string) > 0]
+            
+            if len(cells) >= len(headers_list):
+                player_data = {}
+                for i, header in enumerate(headers_list):
+                    player_data[header] = cells[i]
                 
+                rankings_data.append(player_data)
             else:
-                print(f"Failed to retrieve the page. Status code: {response.status_code}")
-                return None
-        
+                print(f"Row {num+1} has fewer cells ({len(cells)}) than headers ({len(headers_list)})")
         except Exception as e:
-            print(f"An error occurred: {e}")
+            print(f"Error extracting data from row: {e}")
+            continue
+
+    return headers_list, rankings_data
+
+
+# Fetching one ratings page
+ELO_RETRY = RetryPolicy(attempts=4, base_delay=2.0, deadline=120.0)
+
+def fetch_elo_page(session, url, request_headers):
+    with governor.request(url):
+        response = session.get(url, headers=request_headers, timeout=30)
+        # Throttling answers are retried, anything else is judged by scrape_elo_page
+        if response.status_code in THROTTLE_STATUSES:
+            response.raise_for_status()
+    return response
+
+
+def scrape_elo_page(session, url, state):
+    csv_filename = elo_csv_filename(url)
+    with elo_state_lock:
+        previous = dict(state.get(url, {}))
+
+    # Revalidate only while the CSV the validators belong to still exists
+    request_headers = {}
+    if os.path.exists(csv_filename):
+        if previous.get('etag'):
+            request_headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            request_headers['If-Modified-Since'] = previous['last_modified']
+
+    # Send GET request to the URL
+    print(f"Fetching data from {url}...")
+    response = retry_call("elo page", url, lambda: fetch_elo_page(session, url, request_headers), ELO_RETRY)
+    if response.status_code == 304:
+        print(f"Not modified, keeping {csv_filename}")
+        return csv_filename
+    
+    # Explicitly set encoding to handle special characters properly
+    response.encoding = 'utf-8'
+    
+    # Check if the request was successful
+    if response.status_code != 200:
+        print(f"Failed to retrieve the page. Status code: {response.status_code}")
+        return None
+    print(f"Successfully retrieved the page: Status code {response.status_code}")
+
+    validators = {
+        'etag': response.headers.get('ETag', ""),
+        'last_modified': response.headers.get('Last-Modified', ""),
+        'sha256': hashlib.sha256(response.content).hexdigest()
+    }
+
+    # Servers that ignore the validators still send the same bytes when nothing changed
+    if validators['sha256'] == previous.get('sha256') and os.path.exists(csv_filename):
+        print(f"Ratings unchanged, keeping {csv_filename}")
+    else:
+        if stream_elo_table(response.text, csv_filename) is None:
             return None
+        print(f"Data saved to {csv_filename}")
+
+    with elo_state_lock:
+        state[url] = validators
+        save_elo_state(state)
+    return csv_filename
+
+
+def scrape_tennis_elo_rankings(urls):
+    # Headers to mimic a browser request
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    # One keep-alive session for all pages, each page fetched on its own thread
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(len(urls), 1))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    state = load_elo_state()
+    try:
+        with ThreadPoolExecutor(max_workers=max(len(urls), 1)) as executor:
+            futures = {executor.submit(scrape_elo_page, session, url, state): url for url in urls}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"An error occurred with {futures[future]}: {e}")
+    finally:
+        session.close()
+
+
+# A saved ratings page, so the benchmark gives comparable numbers from run to run
+ELO_BENCHMARK_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures", "tennis", "atp_elo_ratings.html")
+
+def compare_elo_parsers(html):
+    '''True if stream_elo_table writes exactly the rows parse_elo_table_soup reads'''
+    parsed = parse_elo_table_soup(html)
+    with tempfile.TemporaryDirectory() as folder:
+        csv_filename = os.path.join(folder, "elo.csv")
+        if stream_elo_table(html, csv_filename) is None:
+            return parsed is None
+        with open(csv_filename, 'r', newline='', encoding='utf-8') as file:
+            streamed = list(csv.DictReader(file))
+    return parsed is not None and streamed == parsed[1]
+
+
+def benchmark_elo_parsers(page = ELO_BENCHMARK_PAGE, repeat = 5):
+    '''
+    Times the old BeautifulSoup parser against stream_elo_table on one ratings page, a saved file
+    (the recorded page by default) or a URL to download, and checks both give the same rows.
+    '''
+    if os.path.exists(page):
+        with open(page, 'r', encoding='utf-8') as file:
+            html = file.read()
+    else:
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        response = requests.get(page, headers=headers, timeout=30)
+        response.encoding = 'utf-8'
+        html = response.text
+
+    with tempfile.TemporaryDirectory() as folder:
+        csv_filename = os.path.join(folder, "elo.csv")
+        timings = {}
+        for name, parse in (("BeautifulSoup", parse_elo_table_soup),
+                            ("streaming", lambda page: stream_elo_table(page, csv_filename))):
+            best = float('inf')
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                parse(html)
+                best = min(best, time.perf_counter() - start_time)
+            timings[name] = best
+    same_rows = compare_elo_parsers(html)
+
+    print(f"{page} ({len(html) / 1024:.0f} KB), best of {repeat}:")
+    for name, best in timings.items():
+        print(f"  {name}: {best * 1000:.0f} ms")
+    print(f"  speedup: {timings['BeautifulSoup'] / timings['streaming']:.1f}x")
+    print(f"  rows {'match' if same_rows else 'DIFFER'}")
+    return timings, same_rows
 #........................................................................................................................
 
-def setup_driver():
+def setup_driver(lean=False):
     options = webdriver.ChromeOptions()
     options.add_argument('--disable-notifications')
     options.add_argument('--headless')  # Run in background
@@ -156,21 +430,20 @@ def setup_driver():
     options.add_argument('--disable-blink-features=AutomationControlled')  # Hide automation
     options.add_experimental_option('excludeSwitches', ['enable-automation'])  # Hide automation
     options.add_experimental_option('useAutomationExtension', False)  # Hide automation
+
+    # Skip images, fonts, media and ad/analytics hosts, we only read text
+    if lean:
+        apply_lean_profile(options)
     
     driver = webdriver.Chrome(options=options)
+    if lean:
+        start_lean_session(driver)
     
     # Execute JS to modify navigator.webdriver flag
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
     return driver
 
-def is_match_live(match_element):
-    try:
-        match_element.find_element(By.CLASS_NAME, "event__stage")
-        return True
-    except NoSuchElementException:
-        return False
-
 def get_tournament_name_and_type(header_text):
     """
     Extracts the tournament name and type (e.g., 'ATP', 'WTA', 'ITF') from header text
@@ -199,140 +472,139 @@ def determine_surface_from_text(raw_text):
     else:
         return 0  # default to hard
 
-def is_desired_tournament(match_element):
-    try:
-        tournament_header = match_element.find_element(By.XPATH, "./preceding::div[contains(@class, 'wclLeagueHeader')][1]")
-        raw_text = tournament_header.text.strip()
-        tournament_name, tournament_type = get_tournament_name_and_type(raw_text)
-
-        # Determine surface from raw text
-        surface = determine_surface_from_text(raw_text)
-        
-        desired_tournaments = [
-            'ATP',
-            'WTA',
-            'CHALLENGER MEN'
-            # 'CHALLENGER WOMEN'
-            # 'ITF Men',
-            # 'ITF Women',
-            # 'United Cup',
-            # 'Davis Cup',
-            # 'Billie Jean King Cup'
-        ]
-        is_desired: bool = False
-
-        for tournament in desired_tournaments:
-            if tournament in tournament_type and 'DOUBLE' not in tournament_type and 'Qualification' not in tournament_name:
-                is_desired = True
-
-        return (is_desired, tournament_name, tournament_type, surface)
-        
-    except NoSuchElementException:
-        return (False, "", "", 0)
-
-def get_upcoming_matches(driver, day=0):
-    driver.get("https://www.flashscore.com/tennis/")
-    upcoming = []
-    
-    if day == 1:
-        next = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-day-picker-arrow='next']"))
-        )
-        next = driver.find_element(By.CSS_SELECTOR, "button[data-day-picker-arrow='next']")
-        driver.execute_script("arguments[0].click();", next)
-    
-    sleep(2)
+def is_desired_tournament_header(raw_text):
+    tournament_name, tournament_type = get_tournament_name_and_type(raw_text)
 
-    try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "event__match"))
-        )
-        
-        matches = driver.find_elements(By.CLASS_NAME, "event__match")
+    # Determine surface from raw text
+    surface = determine_surface_from_text(raw_text)
 
-        for match in matches:
-            try:
-                is_tournament, tournament_name, tournament_type, surface = is_desired_tournament(match)
-                if not is_match_live(match) and is_tournament:
-                    players = WebDriverWait(match, 10).until(
-                        EC.presence_of_all_elements_located((By.CLASS_NAME, "event__participant"))
-                    )
-                    time = WebDriverWait(match, 10).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "event__time"))
-                    )
-                    match_link = WebDriverWait(match, 10).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "eventRowLink"))
-                    ).get_attribute("href")
-                    
-                    upcoming.append({
+    desired_tournaments = [
+        'ATP',
+        'WTA',
+        'CHALLENGER MEN'
+        # 'CHALLENGER WOMEN'
+        # 'ITF Men',
+        # 'ITF Women',
+        # 'United Cup',
+        # 'Davis Cup',
+        # 'Billie Jean King Cup'
+    ]
+    is_desired: bool = False
+
+    for tournament in desired_tournaments:
+        if tournament in tournament_type and 'DOUBLE' not in tournament_type and 'Qualification' not in tournament_name:
+            is_desired = True
+
+    return (is_desired, tournament_name, tournament_type, surface)
+
+# The tennis listing's day picker
+NEXT_DAY_SELECTOR = "button[data-day-picker-arrow='next']"
+
+def iter_upcoming_matches(driver, day=0, last_day=None):
+    '''
+    Yields the matches of the wanted tournaments one by one, as each tournament block is read, for
+    every day from day to last_day (just day by default) in one listing session, each match once.
+    '''
+    load_page(driver, "https://www.flashscore.com/tennis/")
+    seen = set()
+
+    last_day = day if last_day is None else last_day
+    for offset in iter_listing_days(driver, range(day, last_day + 1), NEXT_DAY_SELECTOR):
+        try:
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_all_elements_located((By.CLASS_NAME, "event__match"))
+            )
+            
+            for match, (is_tournament, tournament_name, tournament_type, surface) in iter_league_fixtures(driver, "wclLeagueHeader", is_desired_tournament_header):
+                if not match['live'] and is_tournament:
+                    if not (match['home'] and match['away'] and match['link']):
+                        print(f"Error processing individual match: incomplete row under {match['header']}")
+                        continue
+                    if match['link'] in seen:
+                        continue
+                    seen.add(match['link'])
+
+                    yield {
                         'tournament': tournament_name,
                         'type': tournament_type,
-                        'player1': players[0].text,
-                        'player2': players[1].text,
-                        'time': time.text[:5],
-                        'link': match_link,
+                        'player1': match['home'],
+                        'player2': match['away'],
+                        'time': match['time'][:5],
+                        'link': match['link'],
                         'surface': surface
-                    })
-            except Exception as e:
-                print(f"Error processing individual match: {e}")
-                continue
+                    }
+            page_weight.record(driver, f"tennis listing, day {offset}")
 
-    except Exception as e:
-        print(f"Error getting upcoming matches: {e}")
+        except Exception as e:
+            print(f"Error getting upcoming matches for day {offset}: {e}")
+
+
+def get_upcoming_matches(driver, day=0, last_day=None):
+    return list(iter_upcoming_matches(driver, day, last_day))
+
+
+def harvest_upcoming_matches(driver, day=0, last_day=None):
+    '''{link: match} for every day from day to last_day, read in one listing session'''
+    return {match['link']: match for match in iter_upcoming_matches(driver, day, last_day)}
+
+
+def format_match(match, files):
+    '''Returns (output file, block) for a match, files being the ATP, WTA and Challenger outputs'''
+    # Convert surface number to string
+    surface = 'hard'
+    if match['surface'] == 1: 
+        surface = 'clay'
+    elif match['surface'] == 2: 
+        surface = 'grass'
+
+    tournament_str = match['tournament']
+    tournament_str = tournament_str.split('\n')[0]
+    time_str = match['time']
+    player1 = match['player1']
+    player2 = match['player2']
+    tournament_type = match['type']
 
-    return upcoming
+    file: str = ""
+
+    if "ATP" in tournament_type:
+        file = files[0]
+    elif "WTA" in tournament_type:
+        file = files[1]
+    else:
+        file = files[2]
+
+    # Written in the new format: "player1" vs "player2"
+    return (file, f'{player1} vs {player2}\n'
+                  f'{surface}\n'
+                  f'{tournament_type} - {tournament_str} - {time_str}\n\n')
 
 def main():
     day = 0 # 0 for today, 1 for next day matches
+    last_day = None # Last day read in the same session, None reads only `day`
+    lean = False # Block images, fonts and ad hosts and report bytes transferred per page
     
-    driver = setup_driver()
+    driver = setup_driver(lean)
     try:
-        upcoming = get_upcoming_matches(driver, day)
-        number_of_matches = len(upcoming)
-
         file1 = r"C:\Users\HP\source\repos\Rehoboam\Rehoboam\Data\Tennis\ATP_Singles_Matches.txt"
         file2 = r"C:\Users\HP\source\repos\Rehoboam\Rehoboam\Data\Tennis\WTA_Singles_Matches.txt"
         file3 = r"C:\Users\HP\source\repos\Rehoboam\Rehoboam\Data\Tennis\Challenger_singles.txt"
 
-        
-        last_saved = 0 #Default value is 0
-        for number, match in enumerate(upcoming):
-            # Convert surface number to string
-            surface = 'hard'
-            if match['surface'] == 1: 
-                surface = 'clay'
-            elif match['surface'] == 2: 
-                surface = 'grass'
-
-            if (number+1) > last_saved:
-                tournament_str = match['tournament']
-                tournament_str = tournament_str.split('\n')[0]
-                time_str = match['time']
-                print(f'{number+1}/{number_of_matches}', '\r', end='')
-                player1 = match['player1']
-                player2 = match['player2']
-                tournament_type = match['type']
-
-                file: str = ""
-
-                if "ATP" in tournament_type:
-                    file = file1
-                elif "WTA" in tournament_type:
-                    file = file2
-                else:
-                    file = file3
-
-                with open(file, 'a') as fileObj:
-                    # Write in the new format: "player1" vs "player2"
-                    fileObj.write(f'{player1} vs {player2}\n')
-                    fileObj.write(f'{surface}\n')
-                    fileObj.write(f'{tournament_type} - {tournament_str} - {time_str}\n\n')
-                    
-                time.sleep(1)
-             
+
+        # Matches finished by an earlier run today are skipped, wherever they are in the listing
+        manifest = RunManifest(os.path.join(os.path.dirname(file1), "run_manifest.json"))
+
+        # Nothing to scrape per match, blocks are written while the listing is still being read
+        pipeline = FixturePipeline(
+            format_block=lambda match, results: format_match(match, (file1, file2, file3)),
+            manifest=manifest
+        )
+        pipeline.run(iter_upcoming_matches(driver, day, last_day))
+        print(pipeline.report())
     except Exception as e:
         print(f"Error in main: {e}")
     finally:
+        if lean:
+            print(page_weight.report())
         driver.quit()
 
 if __name__ == "__main__":
@@ -341,4 +613,6 @@ if __name__ == "__main__":
     worker1 = Thread(target=scrape_tennis_elo_rankings, args= ((atp_elo_site, wta_elo_site),))
     worker1.start()
     main()
-    worker1.join()
\ No newline at end of file
+    worker1.join()
+    print(governor.report())
+    print(failure_stats.report())
\ No newline at end of file
@@ -0,0 +1,35 @@
+'''
+stream_elo_table against the BeautifulSoup parser it replaced, on a recorded tennisabstract ratings
+page. The page mentions tables inside a script and a comment ahead of the real ones, which only
+the parser's own idea of a table may count.
+'''
+import csv
+import os
+
+from tennis_scraper import ELO_BENCHMARK_PAGE, compare_elo_parsers, parse_elo_table_soup, stream_elo_table
+
+
+def read_page():
+    with open(ELO_BENCHMARK_PAGE, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def test_streaming_rows_match_beautifulsoup():
+    assert compare_elo_parsers(read_page())
+
+
+def test_ratings_table_is_found_past_script_and_comment(tmp_path):
+    csv_filename = os.path.join(tmp_path, "elo.csv")
+    assert stream_elo_table(read_page(), csv_filename) == 420
+    with open(csv_filename, 'r', newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    headers, _ = parse_elo_table_soup(read_page())
+    assert list(rows[0]) == headers
+    assert rows[0]["Elo Rank"] == "1"
+
+
+def test_page_without_ratings_table(tmp_path):
+    csv_filename = os.path.join(tmp_path, "elo.csv")
+    html = "<html><script>var t = '<table><table><table>';</script><table><tr><td>1</td></tr></table></html>"
+    assert stream_elo_table(html, csv_filename) is None
+    assert not os.path.exists(csv_filename)
@@ -0,0 +1,63 @@
+'''
+add_metrics on one game whose metrics were worked out by hand, and against build_season_row, which
+writes the same ratings into the scraped CSV rounded to two decimals.
+'''
+import math
+
+import pandas as pd
+import pytest
+
+from bbarchivescraper import build_season_row
+from season_metrics import INPUT_COLUMNS, add_metrics
+
+# Archived values are strings, as scraped
+GAME = {
+    "DATE": "01.11.2023", "HOME": "Boston Celtics", "AWAY": "Miami Heat",
+    "H_SCORE": "112", "A_SCORE": "104",
+    "H_FGA": "88", "A_FGA": "85", "H_FG": "41", "A_FG": "38", "H_3FG": "14", "A_3FG": "11",
+    "H_FTA": "20", "A_FTA": "25", "H_FT": "16", "A_FT": "17",
+    "H_OREB": "10", "A_OREB": "9", "H_DREB": "34", "A_DREB": "35", "H_TOV": "13", "A_TOV": "15",
+}
+
+# Home: shots 88 + 0.44 * 20 = 96.8, possessions 96.8 - 10 + 13 = 99.8
+# Away: shots 85 + 0.44 * 25 = 96.0, possessions 96.0 - 9 + 15 = 102.0
+EXPECTED = {
+    "H_POSS": 99.8, "A_POSS": 102.0,
+    "H_OFF_RATING": 112.2244, "A_OFF_RATING": 101.9608,   # 112 / 99.8, 104 / 102
+    "H_DEF_RATING": 104.2084, "A_DEF_RATING": 109.8039,   # 104 / 99.8, 112 / 102
+    "H_NET_RATING": 8.0160, "A_NET_RATING": -7.8431,
+    "H_EFG%": 0.545455, "A_EFG%": 0.511765,               # (41 + 7) / 88, (38 + 5.5) / 85
+    "H_TOV%": 0.118397, "A_TOV%": 0.135135,               # 13 / 109.8, 15 / 111
+    "H_OREB%": 0.222222, "A_OREB%": 0.209302,             # 10 / (10 + 35), 9 / (9 + 34)
+    "H_FT_RATE": 0.181818, "A_FT_RATE": 0.2,              # 16 / 88, 17 / 85
+    "H_TS%": 0.578512, "A_TS%": 0.541667,                 # 112 / 193.6, 104 / 192
+    "PACE": 100.9, "TOTAL": 216.0,
+}
+
+
+def game_frame(*games):
+    return pd.DataFrame([[game[column] for column in INPUT_COLUMNS] for game in games], columns=INPUT_COLUMNS)
+
+
+def test_metrics_match_hand_computed_game():
+    metrics = add_metrics(game_frame(GAME)).iloc[0]
+    for column, expected in EXPECTED.items():
+        assert metrics[column] == pytest.approx(expected, abs=1e-4), column
+
+
+def test_ratings_agree_with_build_season_row():
+    field_names = INPUT_COLUMNS + ["H_OFF_RATING", "A_OFF_RATING", "H_DEF_RATING", "A_DEF_RATING", "TOTAL"]
+    match = {key: GAME[key] for key in ("DATE", "HOME", "AWAY", "H_SCORE", "A_SCORE")}
+    match["link"] = "https://www.flashscore.com/match/Ct7CvEYk/#/match-summary"
+    match_stats = {key: value for key, value in GAME.items() if key not in match}
+    row = dict(zip(field_names, build_season_row(match, match_stats, field_names)))
+
+    metrics = add_metrics(game_frame(GAME)).iloc[0]
+    for column in ("H_OFF_RATING", "A_OFF_RATING", "H_DEF_RATING", "A_DEF_RATING", "TOTAL"):
+        assert float(row[column]) == pytest.approx(round(metrics[column], 2)), column
+
+
+def test_missing_box_score_gives_nan():
+    metrics = add_metrics(game_frame(GAME, dict(GAME, H_FGA="", H_FTA="", H_OREB="", H_TOV=""))).iloc[1]
+    assert math.isnan(metrics["H_OFF_RATING"]) and math.isnan(metrics["H_EFG%"])
+    assert metrics["TOTAL"] == 216.0